@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models.product import ProductType
+from app.schemas.analysis import BottleneckRequest, BottleneckResponse, BalancedAlternative
+from app.services.bottleneck import get_balance_matrix
+from app.services.catalog import get_catalog
+
+router = APIRouter(prefix="/analysis", tags=["analysis"])
+
+
+@router.post("/bottleneck", response_model=BottleneckResponse)
+async def analyze_bottleneck(
+    request: BottleneckRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get how much the CPU or GPU of a pair holds the other back at a
+    resolution, and in-stock parts for the weaker side that balance better.
+    The bottleneck is null when either part has no known performance data.
+    """
+    catalog = await get_catalog(db)
+    cpu = catalog.get(request.cpu_id)
+    gpu = catalog.get(request.gpu_id)
+    
+    if not cpu or cpu.type != ProductType.CPU:
+        raise HTTPException(status_code=404, detail="CPU not found")
+    if not gpu or gpu.type != ProductType.GPU:
+        raise HTTPException(status_code=404, detail="GPU not found")
+    
+    result = get_balance_matrix(catalog).analyze(
+        cpu.id, gpu.id, request.resolution, request.segment, request.limit
+    )
+    
+    return BottleneckResponse(
+        cpu_id=cpu.id,
+        gpu_id=gpu.id,
+        resolution=request.resolution,
+        segment=request.segment,
+        bottleneck_percent=result.percent,
+        limiting_component=result.limiting.value if result.limiting else None,
+        by_resolution=result.by_resolution,
+        alternatives=[
+            BalancedAlternative(product=catalog.get(product_id), bottleneck_percent=percent)
+            for product_id, percent in result.alternatives
+        ],
+    )
@@ -1,15 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Optional
+from typing import List, Optional, Union
 from uuid import UUID
 from datetime import datetime
 import secrets
 
 from app.core.database import get_db
+from app.core.pagination import apply_keyset, build_page
 from app.models.configuration import Configuration
-from app.schemas.configuration import ConfigurationCreate, ConfigurationUpdate, ConfigurationResponse
-from app.services.validation import validate_configuration
+from app.models.preset import PresetSegment
+from app.models.product import ProductType
+from app.schemas.configuration import (
+    ConfigurationCreate,
+    ConfigurationUpdate,
+    ConfigurationResponse,
+    UpgradeSwap,
+    UpgradeOption,
+    UpgradePlanResponse,
+)
+from app.schemas.pagination import Page
+from app.services.catalog import get_catalog
+from app.services.upgrades import plan_upgrades
+from app.services.validation import SLOTS, validate_configuration
 
 router = APIRouter(prefix="/configurations", tags=["configurations"])
 
@@ -19,15 +32,19 @@ def generate_public_link() -> str:
     return secrets.token_urlsafe(16)
 
 
-@router.get("", response_model=List[ConfigurationResponse])
+@router.get("", response_model=Union[List[ConfigurationResponse], Page[ConfigurationResponse]])
 async def get_configurations(
     user_id: Optional[UUID] = Query(None),
     public_link: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get configurations"""
+    """
+    Get configurations.
+    With `cursor` returns a page envelope with `next_cursor` instead of a plain list.
+    """
     query = select(Configuration)
     
     if public_link:
@@ -37,6 +54,11 @@ async def get_configurations(
     else:
         query = query.where(Configuration.is_public == True)
     
+    if cursor is not None:
+        query = apply_keyset(query, [Configuration.created_at, Configuration.id], cursor)
+        result = await db.execute(query.limit(limit + 1))
+        return build_page(result.scalars().all(), limit, key=lambda c: (c.created_at, c.id))
+    
     query = query.order_by(Configuration.created_at.desc())
     query = query.offset(skip).limit(limit)
     
@@ -137,6 +159,67 @@ async def update_configuration(
     return config
 
 
+@router.post("/{config_id}/upgrades", response_model=UpgradePlanResponse)
+async def get_configuration_upgrades(
+    config_id: UUID,
+    budget: float = Query(..., gt=0, description="Money to spend on new parts, in PLN"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Rank the upgrades of a saved configuration that fit the budget: single
+    part swaps and two-part swaps (two better parts, or a better part plus
+    the part it needs, e.g. a motherboard for a CPU on another socket).
+    Ordered by build score gained per PLN under the configuration's segment.
+    """
+    result = await db.execute(select(Configuration).where(Configuration.id == config_id))
+    config = result.scalar_one_or_none()
+    
+    if not config:
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    
+    catalog = await get_catalog(db)
+    
+    # Parts removed from the catalog since the configuration was saved count as empty slots
+    selected = {}
+    for slot, product_id in (config.component_map or {}).items():
+        try:
+            product = catalog.get(UUID(str(product_id)))
+        except ValueError:
+            continue
+        if product is not None and slot in SLOTS:
+            selected[ProductType(slot)] = product.id
+    
+    try:
+        segment = PresetSegment(config.segment) if config.segment else None
+    except ValueError:
+        segment = None
+    
+    upgrades, duration_ms = plan_upgrades(catalog, selected, segment, budget, limit)
+    
+    return UpgradePlanResponse(
+        configuration_id=config.id,
+        budget=budget,
+        upgrades=[
+            UpgradeOption(
+                swaps=[
+                    UpgradeSwap(
+                        component_type=swap.slot.value,
+                        current=catalog.get(swap.from_id) if swap.from_id else None,
+                        replacement=catalog.get(swap.to_id),
+                    )
+                    for swap in upgrade.swaps
+                ],
+                cost=round(upgrade.cost, 2),
+                score_gain=round(upgrade.gain, 2),
+                gain_per_1000_pln=round(upgrade.gain_per_pln * 1000, 2),
+            )
+            for upgrade in upgrades
+        ],
+        duration_ms=duration_ms,
+    )
+
+
 @router.delete("/{config_id}", status_code=204)
 async def delete_configuration(
     config_id: UUID,
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Any, Dict
+
+from app.core.database import AsyncSessionLocal
+from app.schemas.configurator import ConfiguratorMessage
+from app.services.catalog import get_catalog
+from app.services.configurator import ConfiguratorSession
+
+router = APIRouter(prefix="/ws", tags=["configurator"])
+
+
+async def apply_message(session: ConfiguratorSession, message: ConfiguratorMessage) -> Dict[str, Any]:
+    # A short-lived DB session per message: only the catalog version check hits the database
+    async with AsyncSessionLocal() as db:
+        catalog = await get_catalog(db)
+    return session.apply(catalog, message).model_dump(mode="json")
+
+
+@router.websocket("/configurator")
+async def configurator_websocket(websocket: WebSocket):
+    """
+    Live configurator session.
+    The build is kept server-side for the lifetime of the connection; the
+    client sends slot changes and receives the recomputed state after each.
+    """
+    await websocket.accept()
+    session = ConfiguratorSession()
+    
+    try:
+        # Initial (empty) state, so the client can render before the first change
+        await websocket.send_json(await apply_message(session, ConfiguratorMessage(action="refresh")))
+        
+        while True:
+            try:
+                message = ConfiguratorMessage.model_validate_json(await websocket.receive_text())
+                state = await apply_message(session, message)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json(state)
+    except WebSocketDisconnect:
+        pass
@@ -11,6 +11,11 @@ from app.core.database import get_db
 from app.models.product import Product, ProductType, ProductSegment
 from app.models.inquiry import Inquiry
 from app.schemas.product import ProductCreate
+from app.services.catalog import bump_catalog_version
+from app.services.search import index_product
+from app.services.specs import sync_product_attributes
+from app.services.price_history import record_price
+from app.services.recommendation import schedule_recommendation_refresh
 
 router = APIRouter(prefix="/import-export", tags=["import-export"])
 
@@ -30,6 +35,7 @@ async def import_products_csv(
     
     imported = 0
     errors = []
+    new_products = []
     
     for row_num, row in enumerate(reader, start=2):
         try:
@@ -61,12 +67,22 @@ async def import_products_csv(
                 updated_at=datetime.utcnow().isoformat(),
             )
             db.add(db_product)
+            new_products.append(db_product)
             imported += 1
             
         except Exception as e:
             errors.append(f"Row {row_num}: {str(e)}")
     
+    if imported:
+        await db.flush()
+        for db_product in new_products:
+            await sync_product_attributes(db, db_product)
+            await index_product(db, db_product)
+            await record_price(db, db_product)
+        await bump_catalog_version(db)
     await db.commit()
+    if imported:
+        schedule_recommendation_refresh()
     
     return {
         "imported": imported,
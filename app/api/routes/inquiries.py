@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional, Union
 from uuid import UUID
 from datetime import datetime
 import secrets
 
 from app.core.database import get_db
+from app.core.pagination import apply_keyset, build_page
 from app.models.inquiry import Inquiry, InquiryType, InquirySource
 from app.schemas.inquiry import InquiryCreate, InquiryResponse
+from app.schemas.pagination import Page
 from app.services.email import send_inquiry_notification
 
 router = APIRouter(prefix="/inquiries", tags=["inquiries"])
@@ -132,13 +134,22 @@ async def get_inquiry(
     return inquiry
 
 
-@router.get("", response_model=List[InquiryResponse])
+@router.get("", response_model=Union[List[InquiryResponse], Page[InquiryResponse]])
 async def list_inquiries(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all inquiries (admin only - should add auth later)"""
+    """
+    List all inquiries (admin only - should add auth later).
+    With `cursor` returns a page envelope with `next_cursor` instead of a plain list.
+    """
+    if cursor is not None:
+        query = apply_keyset(select(Inquiry), [Inquiry.created_at, Inquiry.id], cursor)
+        result = await db.execute(query.limit(limit + 1))
+        return build_page(result.scalars().all(), limit, key=lambda i: (i.created_at, i.id))
+    
     result = await db.execute(
         select(Inquiry)
         .order_by(Inquiry.created_at.desc())
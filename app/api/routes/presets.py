@@ -1,30 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Union
 from uuid import UUID
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import apply_keyset, build_page
 from app.models.preset import Preset, DeviceType, PresetSegment
 from app.models.product import Product
-from app.schemas.preset import PresetCreate, PresetResponse, PresetQuery, PresetDetailResponse
-from app.schemas.product import ProductResponse
+from app.schemas.preset import (
+    PresetCreate,
+    PresetResponse,
+    PresetQuery,
+    PresetDetailResponse,
+    GeneratedBuild,
+    GeneratedBuildsResponse,
+)
+from app.schemas.product import ProductResponse, ProductCompactResponse
+from app.schemas.pagination import Page
+from app.services.catalog import bump_catalog_version, get_catalog, PRESETS_CATALOG
+from app.services.build_generator import BUILD_SLOTS, generate_builds
+from app.services.recommendation import get_recommendations as recommend_presets, schedule_recommendation_refresh
 
 router = APIRouter(prefix="/presets", tags=["presets"])
 
 
-@router.get("", response_model=List[PresetResponse])
+@router.get("", response_model=Union[List[PresetResponse], Page[PresetResponse]])
 async def get_presets(
     device_type: Optional[DeviceType] = Query(None),
     segment: Optional[PresetSegment] = Query(None),
     budget: Optional[float] = Query(None, gt=0),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get presets with optional filters. Used for recommendations."""
+    """
+    Get presets with optional filters. Used for recommendations.
+    With `cursor` returns a page envelope with `next_cursor` instead of a plain list.
+    """
     query = select(Preset).where(Preset.is_active == True)
     
     if device_type:
@@ -40,6 +56,24 @@ async def get_presets(
             )
         )
     
+    if cursor is not None:
+        # Same ordering as below, with NULLs folded so the key is comparable
+        query = apply_keyset(query, [
+            func.coalesce(Preset.priority, 0),
+            func.coalesce(Preset.performance_score, -1.0),
+            Preset.id,
+        ], cursor)
+        result = await db.execute(query.limit(limit + 1))
+        return build_page(
+            result.scalars().all(),
+            limit,
+            key=lambda p: (
+                p.priority or 0,
+                p.performance_score if p.performance_score is not None else -1.0,
+                p.id,
+            ),
+        )
+    
     # Order by priority (higher first), then by performance score
     query = query.order_by(Preset.priority.desc(), Preset.performance_score.desc())
     query = query.offset(skip).limit(limit)
@@ -56,29 +90,49 @@ async def get_recommendations(
     db: AsyncSession = Depends(get_db),
 ):
     """Get top recommendations based on device type, segment, and budget"""
-    query = select(Preset).where(
-        and_(
-            Preset.device_type == query_params.device_type,
-            Preset.segment == query_params.segment,
-            Preset.is_active == True,
-        )
+    return await recommend_presets(
+        query_params.device_type,
+        query_params.segment,
+        query_params.budget,
+        db,
+        limit=limit,
     )
+
+
+@router.get("/generate", response_model=GeneratedBuildsResponse)
+async def generate_presets(
+    query_params: PresetQuery = Depends(),
+    limit: int = Query(3, ge=1, le=10),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Assemble the best-scoring compatible builds within budget from the catalog.
+    Unlike /recommendations this is not limited to the curated presets.
+    """
+    if query_params.device_type != DeviceType.PC:
+        raise HTTPException(status_code=400, detail="Builds can only be generated for PCs")
+    if not query_params.budget:
+        raise HTTPException(status_code=400, detail="budget is required")
     
-    if query_params.budget:
-        query = query.where(
-            and_(
-                (Preset.min_budget.is_(None) | (Preset.min_budget <= query_params.budget)),
-                (Preset.max_budget.is_(None) | (Preset.max_budget >= query_params.budget)),
-            )
-        )
-    
-    # Order by priority and performance
-    query = query.order_by(Preset.priority.desc(), Preset.performance_score.desc())
-    query = query.limit(limit)
+    catalog = await get_catalog(db)
+    builds, explored, truncated, duration_ms = generate_builds(catalog, query_params.segment, query_params.budget, limit)
     
-    result = await db.execute(query)
-    presets = result.scalars().all()
-    return presets
+    return GeneratedBuildsResponse(
+        builds=[
+            GeneratedBuild(
+                component_map={slot.value: str(build.parts[slot].id) for slot in BUILD_SLOTS},
+                products=[
+                    ProductCompactResponse.model_validate(catalog.get(build.parts[slot].id)) for slot in BUILD_SLOTS
+                ],
+                total_price=round(build.price, 2),
+                performance_score=round(build.score, 2),
+            )
+            for build in builds
+        ],
+        explored=explored,
+        truncated=truncated,
+        duration_ms=duration_ms,
+    )
 
 
 @router.get("/{preset_id}", response_model=PresetResponse)
@@ -146,7 +200,9 @@ async def create_preset(
         updated_at=datetime.utcnow().isoformat(),
     )
     db.add(db_preset)
+    await bump_catalog_version(db, PRESETS_CATALOG)
     await db.commit()
+    schedule_recommendation_refresh()
     await db.refresh(db_preset)
     return db_preset
 
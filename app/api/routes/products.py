@@ -1,50 +1,270 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
+import bisect
+import json
 
 from app.core.database import get_db
+from app.core.pagination import decode_cursor, build_page
 from app.models.product import Product, ProductType, ProductSegment
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.models.preset import PresetSegment
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductCompactResponse,
+    ProductProjection,
+    ProductBatchRequest,
+    ProductBatchResponse,
+    FacetValue,
+    FacetsResponse,
+    PriceHistoryResponse,
+    PsuCandidate,
+    AlternativeProduct,
+    SimilarProduct,
+    FrontierProduct,
+)
+from app.schemas.pagination import Page
+from app.services.catalog import (
+    CatalogSnapshot,
+    get_catalog,
+    get_current_catalog,
+    bump_catalog_version,
+    get_serialized_products,
+)
+from app.services.search import search_product_ids, index_product, remove_product_from_index
+from app.services.specs import sync_product_attributes, delete_product_attributes
+from app.services.facets import get_facet_index, sort_facet_values
+from app.services.compatibility import get_compatibility_index, resolve_selection
+from app.services.psu import get_psu_index
+from app.services.price_history import record_price, delete_price_history, get_price_history
+from app.services.recommendation import get_alternative_components, schedule_recommendation_refresh
+from app.services.similarity import get_similarity_index
+from app.services.frontier import get_frontier_index
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
-@router.get("", response_model=List[ProductResponse])
+def resolve_fields(view: Optional[str], fields: Optional[str]) -> Optional[List[str]]:
+    """Field names to project to, or None for the full ProductResponse"""
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(names) - set(ProductResponse.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # id is always included so clients can key rows
+        return ["id"] + [name for name in names if name != "id"]
+    if view == "compact":
+        return list(ProductCompactResponse.model_fields)
+    return None
+
+
+def project(
+    catalog: CatalogSnapshot,
+    products: List[ProductResponse],
+    names: List[str],
+) -> List[Dict[str, Any]]:
+    """Project products to the given fields from their pre-serialized rows"""
+    rows = get_serialized_products(catalog)
+    return [{name: rows[p.id][name] for name in names} for p in products]
+
+
+@router.get("", response_model=Union[
+    List[ProductResponse],
+    Page[ProductResponse],
+    List[ProductProjection],
+    Page[ProductProjection],
+])
 async def get_products(
     type: Optional[ProductType] = Query(None),
     segment: Optional[ProductSegment] = Query(None),
     in_stock: Optional[bool] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor; pass an empty value for the first page"),
+    compatible_with: Optional[str] = Query(
+        None, description='Partial component map as JSON, e.g. {"cpu": "<uuid>"}'
+    ),
+    view: Optional[str] = Query(None, pattern="^(full|compact)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get list of products with optional filters"""
-    query = select(Product)
+    """
+    Get list of products with optional filters (served from the catalog snapshot).
+    Without `cursor` returns a plain list paged by skip/limit; with `cursor`
+    returns a page envelope with `next_cursor`.
+    `compatible_with` keeps only parts that pass the socket, RAM type,
+    clearance and PSU checks against the given components.
+    `view=compact` or `fields=` return a projection without specs and description.
+    """
+    names = resolve_fields(view, fields)
+    catalog = await get_catalog(db)
     
-    if type:
-        query = query.where(Product.type == type)
     # Note: segment parameter ignored for now - components are available for all segments
-    if in_stock is not None:
-        query = query.where(Product.in_stock == in_stock)
+    products = catalog.select(type=type, in_stock=in_stock)
     
-    query = query.offset(skip).limit(limit)
+    if compatible_with:
+        try:
+            components = json.loads(compatible_with)
+            if not isinstance(components, dict):
+                raise ValueError(compatible_with)
+            selected = resolve_selection(catalog, components)
+        except (ValueError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid compatible_with component map")
+        
+        index = get_compatibility_index(catalog)
+        allowed = {t: index.compatible_ids(t, selected) for t in ([type] if type else ProductType)}
+        products = [p for p in products if allowed[p.type] is None or p.id in allowed[p.type]]
     
-    result = await db.execute(query)
-    products = result.scalars().all()
+    if cursor is None:
+        products = products[skip:skip + limit]
+        if names:
+            return JSONResponse(project(catalog, products, names))
+        return products
+    
+    # Snapshot lists are in id order, so the cursor is just the last id
+    start = 0
+    if cursor:
+        try:
+            last_id = UUID(decode_cursor(cursor, 1)[0])
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        start = bisect.bisect_right(products, last_id, key=lambda p: p.id)
+    
+    page = build_page(products[start:start + limit + 1], limit, key=lambda p: (p.id,))
+    if names:
+        return JSONResponse({"items": project(catalog, page.items, names), "next_cursor": page.next_cursor})
+    return page
+
+
+@router.get("/search", response_model=Union[List[ProductResponse], List[ProductProjection]])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[ProductType] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    view: Optional[str] = Query(None, pattern="^(full|compact)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text product search with prefix matching, best match first"""
+    names = resolve_fields(view, fields)
+    matches = await search_product_ids(db, q, limit=limit, product_type=type)
+    catalog = await get_catalog(db)
+    
+    products = []
+    for product_id, _rank in matches:
+        product = catalog.get(product_id)
+        if product:
+            products.append(product)
+    
+    if names:
+        return JSONResponse(project(catalog, products, names))
     return products
 
 
+@router.get("/facets", response_model=FacetsResponse)
+async def get_product_facets(
+    type: Optional[ProductType] = Query(None),
+    in_stock: Optional[bool] = Query(None),
+    brand: List[str] = Query([]),
+    socket: List[str] = Query([]),
+    vram_gb: List[str] = Query([]),
+    ram_type: List[str] = Query([]),
+    form_factor: List[str] = Query([]),
+    price_band: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
+):
+    """Facet values with counts for the current filter selection"""
+    catalog = await get_catalog(db)
+    index = get_facet_index(catalog)
+    
+    total, counts = index.counts(
+        type=type,
+        in_stock=in_stock,
+        filters={
+            "brand": brand,
+            "socket": socket,
+            "vram_gb": vram_gb,
+            "ram_type": ram_type,
+            "form_factor": form_factor,
+            "price_band": price_band,
+        },
+    )
+    
+    return FacetsResponse(
+        total=total,
+        facets={
+            facet: [FacetValue(value=value, count=count) for value, count in sort_facet_values(facet, values)]
+            for facet, values in counts.items()
+        },
+    )
+
+
+@router.get("/psu-candidates", response_model=List[PsuCandidate])
+async def get_psu_candidates(
+    required_w: float = Query(..., gt=0, description="Required PSU wattage, e.g. recommended_psu_wattage"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get in-stock PSUs of at least `required_w`, cheapest first"""
+    catalog = await get_catalog(db)
+    return get_psu_index(catalog).candidates(required_w, limit)
+
+
+@router.get("/frontier", response_model=List[FrontierProduct])
+async def get_price_performance_frontier(
+    type: ProductType,
+    score: str = Query("performance", pattern="^(performance|gaming|productivity|benchmark)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the in-stock parts of a type that no other part beats on both price
+    and score, cheapest first. Scored parts missing from the list are
+    beaten on both. `performance` falls back to the built-in CPU/GPU
+    tables and RAM/storage scores; parts without the requested score
+    (including CPUs and GPUs not in the tables) are left out, not ranked.
+    """
+    catalog = await get_catalog(db)
+    return [
+        FrontierProduct(product=point.product, score=point.score)
+        for point in get_frontier_index(catalog).frontier(type, score)
+    ]
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    request: ProductBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get many products by ID in one round trip; unknown IDs are listed in `missing`"""
+    ids = list(dict.fromkeys(request.ids))
+    
+    catalog = await get_current_catalog(db)
+    if catalog is not None:
+        found = {pid: catalog.get(pid) for pid in ids if catalog.get(pid) is not None}
+    else:
+        # Snapshot is stale or not loaded yet - a single IN query beats a full reload
+        result = await db.execute(select(Product).where(Product.id.in_(ids)))
+        found = {p.id: ProductResponse.model_validate(p) for p in result.scalars().all()}
+    
+    return ProductBatchResponse(
+        products=[found[pid] for pid in ids if pid in found],
+        missing=[pid for pid in ids if pid not in found],
+    )
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     """Get a single product by ID"""
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
+    catalog = await get_catalog(db)
+    product = catalog.get(product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -52,6 +272,89 @@ async def get_product(
     return product
 
 
+@router.get("/{product_id}/price-history", response_model=PriceHistoryResponse)
+async def get_product_price_history(
+    product_id: UUID,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    resolution: str = Query("auto", pattern="^(auto|day|week|month)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get price changes of a product, downsampled to one point per day, week or month"""
+    catalog = await get_catalog(db)
+    if not catalog.get(product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    to_date = to_date or datetime.utcnow().date()
+    if from_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    resolution, points = await get_price_history(db, product_id, from_date, to_date, resolution)
+    return PriceHistoryResponse(product_id=product_id, resolution=resolution, points=points)
+
+
+@router.get("/{product_id}/alternatives", response_model=List[AlternativeProduct])
+async def get_product_alternatives(
+    product_id: UUID,
+    compatible_with: Optional[str] = Query(
+        None, description='Rest of the build as a JSON component map, e.g. {"cpu": "<uuid>"}'
+    ),
+    segment: Optional[PresetSegment] = None,
+    budget: Optional[float] = Query(None, gt=0, description="Budget of the whole build"),
+    limit: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get in-stock replacements for a component, best value first.
+    With `compatible_with` only parts compatible with the rest of the build
+    are returned, and `budget` caps the build's total price after the swap.
+    """
+    catalog = await get_catalog(db)
+    if not catalog.get(product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    selected = {}
+    if compatible_with:
+        try:
+            components = json.loads(compatible_with)
+            if not isinstance(components, dict):
+                raise ValueError(compatible_with)
+            selected = resolve_selection(catalog, components)
+        except (ValueError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid compatible_with component map")
+    
+    alternatives = get_alternative_components(catalog, product_id, selected, segment, budget, limit)
+    return [
+        AlternativeProduct(product=catalog.get(alt.product_id), **alt._asdict())
+        for alt in alternatives
+    ]
+
+
+@router.get("/{product_id}/similar", response_model=List[SimilarProduct])
+async def get_similar_products(
+    product_id: UUID,
+    k: int = Query(10, ge=1, le=100),
+    max_price: Optional[float] = Query(None, gt=0),
+    in_stock: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the products of the same type closest to this one by price, scores
+    and parsed specs, nearest first. `max_price` narrows it down to e.g.
+    "like this one but cheaper".
+    """
+    catalog = await get_catalog(db)
+    product = catalog.get(product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    neighbours = get_similarity_index(catalog).nearest(product, k, max_price=max_price, in_stock=in_stock)
+    return [
+        SimilarProduct(product=catalog.get(neighbour.product_id), distance=neighbour.distance)
+        for neighbour in neighbours
+    ]
+
+
 @router.post("", response_model=ProductResponse, status_code=201)
 async def create_product(
     product: ProductCreate,
@@ -64,7 +367,13 @@ async def create_product(
         updated_at=datetime.utcnow().isoformat(),
     )
     db.add(db_product)
+    await db.flush()
+    await sync_product_attributes(db, db_product)
+    await index_product(db, db_product)
+    await record_price(db, db_product)
+    await bump_catalog_version(db)
     await db.commit()
+    schedule_recommendation_refresh()
     await db.refresh(db_product)
     return db_product
 
@@ -84,11 +393,19 @@ async def update_product(
     
     update_data = product_update.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.utcnow().isoformat()
+    previous_price = product.price
     
     for field, value in update_data.items():
         setattr(product, field, value)
     
+    if "specifications" in update_data:
+        await sync_product_attributes(db, product)
+    if "price" in update_data:
+        await record_price(db, product, previous=previous_price)
+    await index_product(db, product)
+    await bump_catalog_version(db)
     await db.commit()
+    schedule_recommendation_refresh()
     await db.refresh(product)
     return product
 
@@ -105,7 +422,12 @@ async def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    await delete_product_attributes(db, product_id)
+    await delete_price_history(db, product_id)
+    await remove_product_from_index(db, product_id)
     await db.delete(product)
+    await bump_catalog_version(db)
     await db.commit()
+    schedule_recommendation_refresh()
     return None
 
@@ -8,6 +8,7 @@ from app.core.database import get_db
 from app.models.inquiry import Inquiry
 from app.models.product import Product, ProductType
 from app.models.configuration import Configuration
+from app.services.validation import validation_cache
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
@@ -112,3 +113,8 @@ async def get_segment_distribution(
     
     return {"distribution": segments}
 
+
+@router.get("/validation-cache")
+async def get_validation_cache_statistics():
+    """Get hit/miss counters of this worker's validation result cache"""
+    return validation_cache.stats()
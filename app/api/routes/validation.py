@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+import time
 
 from app.core.database import get_db
-from app.schemas.validation import ValidationRequest, ValidationResponse
-from app.services.validation import validate_configuration
+from app.schemas.validation import (
+    ValidationRequest,
+    ValidationResponse,
+    BatchValidationRequest,
+    BatchValidationResponse,
+    DeltaValidationRequest,
+)
+from app.services.validation import validate_configuration_state, validate_configurations, validate_delta
 
 router = APIRouter(prefix="/validate", tags=["validation"])
 
@@ -14,5 +21,41 @@ async def validate_configuration_endpoint(
     db: AsyncSession = Depends(get_db),
 ):
     """Validate PC configuration compatibility"""
-    return await validate_configuration(request.components, db)
+    return await validate_configuration_state(request.components, db)
 
+
+@router.post("/delta", response_model=ValidationResponse)
+async def validate_delta_endpoint(
+    request: DeltaValidationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Revalidate after changing one slot, re-running only the rules that read it.
+    Pass the `state` of the previous response (from /validate or /validate/delta).
+    """
+    try:
+        return await validate_delta(request.state, request.slot, request.product_id, db)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid validation state, slot or product id")
+
+
+@router.post("/batch", response_model=BatchValidationResponse)
+async def validate_configurations_endpoint(
+    request: BatchValidationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Validate many PC configurations in one request. A configuration with a
+    malformed product id comes back invalid with an `invalid_id` issue.
+    """
+    started = time.perf_counter()
+    results, product_count = await validate_configurations(request.configurations, db)
+    valid_count = sum(1 for result in results if result.is_valid)
+    
+    return BatchValidationResponse(
+        results=results,
+        valid_count=valid_count,
+        invalid_count=len(results) - valid_count,
+        product_count=product_count,
+        duration_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
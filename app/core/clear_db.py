@@ -5,6 +5,7 @@ from sqlalchemy import delete
 from app.core.database import AsyncSessionLocal
 from app.models.product import Product
 from app.models.preset import Preset
+from app.services.catalog import bump_catalog_version, PRESETS_CATALOG
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,11 +16,13 @@ async def clear_all_data():
         
         # Delete all presets first (due to foreign key constraints)
         await db.execute(delete(Preset))
+        await bump_catalog_version(db, PRESETS_CATALOG)
         await db.commit()
         logger.info("All presets deleted")
         
         # Delete all products
         await db.execute(delete(Product))
+        await bump_catalog_version(db)
         await db.commit()
         logger.info("All products deleted")
         
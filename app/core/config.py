@@ -34,6 +34,19 @@ class Settings(BaseSettings):
     # reCAPTCHA
     recaptcha_secret_key: Optional[str] = None
 
+    # HTTP caching (Cache-Control sent with ETag on catalog routes)
+    products_cache_control: str = "public, max-age=60"
+    presets_cache_control: str = "public, max-age=300"
+
+    # Validation results kept per worker (LRU, by component map)
+    validation_cache_size: int = 2048
+
+    # Budget step (PLN) of the precomputed preset recommendations
+    recommendation_budget_step: int = 250
+
+    # Time (ms) the build generator may search per request before returning the best builds so far
+    build_generator_max_ms: float = 80
+
     # App meta
     app: AppInfo = AppInfo()
 
@@ -0,0 +1,59 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+from app.schemas.pagination import Page
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode ORDER BY key values of the last row into an opaque cursor"""
+    raw = json.dumps([str(v) if v is not None else None for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+def apply_keyset(query: Select, columns: Sequence[Any], cursor: Optional[str]) -> Select:
+    """
+    Order the query by the given key columns (all descending) and, if a
+    cursor is given, seek past the row it points to.
+    The last column must be unique (usually the primary key).
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        try:
+            values = [column.type.python_type(value) for column, value in zip(columns, values)]
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(*columns) < tuple(values))
+
+    return query
+
+
+def build_page(rows: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Page:
+    """
+    Build a page from up to limit + 1 fetched rows.
+    The extra row only signals that there is a next page.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(key(items[-1]))
+
+    return Page(items=items, next_cursor=next_cursor)
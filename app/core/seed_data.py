@@ -9,6 +9,7 @@ from sqlalchemy import select
 from app.core.database import AsyncSessionLocal
 from app.models.product import Product, ProductType, ProductSegment
 from app.models.preset import Preset, DeviceType, PresetSegment
+from app.services.catalog import bump_catalog_version, PRESETS_CATALOG
 
 
 # TechLipton recommended sets data
@@ -264,6 +265,8 @@ async def seed_presets():
                 
                 print(f"Created preset: {set_data['name']}")
             
+            await bump_catalog_version(db)
+            await bump_catalog_version(db, PRESETS_CATALOG)
             await db.commit()
             print(f"Successfully seeded {len(TECHLIPTON_SETS)} presets!")
             
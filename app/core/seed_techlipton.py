@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import AsyncSessionLocal, engine
 from app.models.product import Product, ProductType, ProductSegment
 from app.models.preset import Preset, DeviceType, PresetSegment, preset_products
+from app.services.catalog import bump_catalog_version, PRESETS_CATALOG
+from app.services.scoring import score_products
 from sqlalchemy import select
 import uuid
 
@@ -13,112 +15,7 @@ logger = logging.getLogger(__name__)
 
 def calculate_performance_score(products_list: list, segment: PresetSegment) -> float:
     """Calculate performance score based on components and segment."""
-    
-    # Component scores mapping
-    cpu_scores = {
-        "AMD Ryzen 5 3600": 40,
-        "AMD Ryzen 5 5600GT": 45,
-        "AMD Ryzen 5 8400F": 50,
-        "AMD Ryzen 5 8500G": 52,
-        "AMD Ryzen 5 7500F": 60,
-        "AMD Ryzen 5 7600": 62,
-        "AMD Ryzen 5 7600X": 65,
-        "AMD Ryzen 5 7500X3D": 68,
-        "AMD Ryzen 5 9600X": 70,
-        "AMD Ryzen 7 8700F": 72,
-        "Intel Core i5-14600KF": 75,
-        "AMD Ryzen 7 7700X": 78,
-        "AMD Ryzen 7 7800X3D": 90,
-        "AMD Ryzen 7 9700X": 85,
-        "AMD Ryzen 9 7900X": 88,
-        "AMD Ryzen 7 9800X3D": 95,
-        "AMD Ryzen 9 9900X": 92,
-        "AMD Ryzen 9 9900X3D": 96,
-        "AMD Ryzen 9 9950X": 98,
-        "AMD Ryzen 9 9950X3D": 100,
-    }
-    
-    gpu_scores = {
-        "ASRock Radeon RX 9060 XT Challenger OC 8GB": 45,
-        "ASRock Radeon RX 9060 XT Challenger OC 16GB": 50,
-        "KFA2 GeForce RTX 5060 Ti 1-Click OC 16GB": 55,
-        "Zotac GeForce RTX 5070 Twin Edge 12GB": 70,
-        "Sapphire Radeon RX 9070 Pulse 16GB": 75,
-        "Gigabyte Radeon RX 9070 XT Gaming OC 16GB": 80,
-        "ASRock Radeon RX 9070 XT Steel Legend Dark 16GB": 80,
-        "INNO3D GeForce RTX 5070 Ti X3 16GB": 85,
-        "ASUS GeForce RTX 5070 Ti Prime OC 16GB": 85,
-        "Zotac GeForce RTX 5080 Solid Core OC 16GB": 92,
-        "Gigabyte GeForce RTX 5090 AORUS Master 32GB": 100,
-    }
-    
-    # Segment weights
-    weights = {
-        PresetSegment.GAMING: {"cpu": 0.25, "gpu": 0.50, "ram": 0.15, "storage": 0.10},
-        PresetSegment.PRO: {"cpu": 0.40, "gpu": 0.30, "ram": 0.20, "storage": 0.10},
-        PresetSegment.BUSINESS: {"cpu": 0.50, "gpu": 0.10, "ram": 0.25, "storage": 0.15},
-        PresetSegment.HOME: {"cpu": 0.30, "gpu": 0.35, "ram": 0.20, "storage": 0.15},
-    }
-    
-    scores = {"cpu": 0, "gpu": 0, "ram": 0, "storage": 0}
-    
-    for product in products_list:
-        # CPU scoring
-        if product.type == ProductType.CPU:
-            scores["cpu"] = cpu_scores.get(product.name, 50)
-        
-        # GPU scoring
-        elif product.type == ProductType.GPU:
-            scores["gpu"] = gpu_scores.get(product.name, 50)
-        
-        # RAM scoring
-        elif product.type == ProductType.RAM:
-            capacity = product.specifications.get("Pojemność", "16 GB")
-            speed = product.specifications.get("Taktowanie", "3200 MHz")
-            ram_type = product.specifications.get("Typ", "DDR4")
-            
-            # Base score from capacity
-            if "64 GB" in capacity or "64GB" in capacity:
-                ram_score = 100
-            elif "32 GB" in capacity or "32GB" in capacity:
-                ram_score = 75
-            else:
-                ram_score = 50
-            
-            # Adjust for speed and type
-            if ram_type == "DDR5":
-                if "6400" in speed:
-                    ram_score = min(100, ram_score + 10)
-                elif "6000" in speed:
-                    ram_score = min(100, ram_score + 5)
-            
-            scores["ram"] = ram_score
-        
-        # Storage scoring
-        elif product.type == ProductType.STORAGE:
-            capacity = product.specifications.get("Pojemność", "1 TB")
-            interface = product.specifications.get("Interfejs", "PCIe 4.0")
-            
-            # Base score from capacity
-            storage_score = 100 if ("2 TB" in capacity or "2TB" in capacity) else 70
-            
-            # Adjust for interface
-            if "PCIe 5.0" in interface or "Gen5" in interface:
-                storage_score = min(100, storage_score + 15)
-            
-            scores["storage"] = storage_score
-    
-    # Calculate weighted score
-    segment_weights = weights.get(segment, weights[PresetSegment.GAMING])
-    
-    final_score = (
-        scores["cpu"] * segment_weights["cpu"] +
-        scores["gpu"] * segment_weights["gpu"] +
-        scores["ram"] * segment_weights["ram"] +
-        scores["storage"] * segment_weights["storage"]
-    )
-    
-    return round(final_score, 2)
+    return score_products(products_list, segment)
 
 def get_case_image_url(components_list: list) -> str:
     """Get the image URL for the case in the preset."""
@@ -372,6 +269,7 @@ async def seed_techlipton_data():
             if not existing_product:
                 product = Product(**p_data)
                 db.add(product)
+                await bump_catalog_version(db)
                 await db.commit()
                 await db.refresh(product)
                 created_products[p_data["name"]] = product
@@ -563,6 +461,7 @@ async def seed_techlipton_data():
                 for product in products_list:
                     preset.products.append(product)
                 
+                await bump_catalog_version(db, PRESETS_CATALOG)
                 await db.commit()
                 logger.info(f"Created preset: {preset.name}")
             else:
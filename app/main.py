@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.conditional_get import ConditionalGetMiddleware, CacheRule
+from app.services.catalog import PRODUCTS_CATALOG, PRESETS_CATALOG
 from app.api.routes.health import router as health_router
 from app.api.routes.products import router as products_router
 from app.api.routes.presets import router as presets_router
@@ -12,6 +14,8 @@ from app.api.routes.configurations import router as configurations_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.import_export import router as import_export_router
 from app.api.routes.statistics import router as statistics_router
+from app.api.routes.configurator import router as configurator_router
+from app.api.routes.analysis import router as analysis_router
 
 
 def create_app() -> FastAPI:
@@ -22,6 +26,17 @@ def create_app() -> FastAPI:
         openapi_url="/api/openapi.json",
     )
 
+    # Conditional GET for catalog routes; added first so CORS headers still wrap 304s
+    application.add_middleware(
+        ConditionalGetMiddleware,
+        rules=[
+            # Price history defaults `to` to today, so it changes daily without a catalog write
+            CacheRule(r"^/api/v1/products(?!/[^/]+/price-history/?$)(/|$)", (PRODUCTS_CATALOG,), settings.products_cache_control),
+            # Preset details embed products, so presets depend on both catalogs
+            CacheRule(r"^/api/v1/presets(/|$)", (PRESETS_CATALOG, PRODUCTS_CATALOG), settings.presets_cache_control),
+        ],
+    )
+
     application.add_middleware(
         CORSMiddleware,
         allow_origins=[settings.cors_origin],
@@ -42,12 +57,18 @@ def create_app() -> FastAPI:
     application.include_router(auth_router, prefix="/api/v1")
     application.include_router(import_export_router, prefix="/api/v1")
     application.include_router(statistics_router, prefix="/api/v1")
+    application.include_router(configurator_router, prefix="/api/v1")
+    application.include_router(analysis_router, prefix="/api/v1")
     
     # Startup event: Initialize database tables
     @application.on_event("startup")
     async def startup_event():
         """Create database tables on startup if they don't exist"""
-        from app.core.database import engine, Base
+        from app.core.database import engine, Base, AsyncSessionLocal
+        from app.services.search import ensure_search_index
+        from app.services.specs import ensure_product_attributes
+        from app.services.price_history import ensure_price_history
+        from app.services.recommendation import refresh_recommendation_table, load_recommendation_table
         
         try:
             async with engine.begin() as conn:
@@ -57,6 +78,24 @@ def create_app() -> FastAPI:
         except Exception as e:
             print(f"⚠ Database initialization error: {e}")
             # Don't fail startup - tables might already exist
+        
+        try:
+            # Backfill typed attributes, the full-text index and price history for products written by seed scripts
+            async with AsyncSessionLocal() as db:
+                await ensure_product_attributes(db)
+                await ensure_search_index(db)
+                await ensure_price_history(db)
+            print("✓ Product indexes ready")
+        except Exception as e:
+            print(f"⚠ Product index initialization error: {e}")
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                await refresh_recommendation_table(db)
+                await load_recommendation_table(db)
+            print("✓ Recommendation table ready")
+        except Exception as e:
+            print(f"⚠ Recommendation table error: {e}")
 
     return application
 
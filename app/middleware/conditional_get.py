@@ -0,0 +1,101 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.catalog_version import CatalogVersion
+
+
+class CacheRule(NamedTuple):
+    """GET routes under `path` whose representation depends only on `catalogs`"""
+    path: str  # regex matched against the request path
+    catalogs: Tuple[str, ...]  # catalog_versions names, e.g. ("products",)
+    cache_control: str
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """
+    ETag / Last-Modified support for catalog-backed GET routes.
+    The ETag is derived from the catalog version counters and the request
+    URL, so a matching If-None-Match (or a fresh If-Modified-Since) is
+    answered with 304 after a single version lookup, before the route runs.
+    """
+
+    def __init__(self, app, rules: Sequence[CacheRule]):
+        super().__init__(app)
+        self.rules = [(re.compile(rule.path), rule) for rule in rules]
+
+    def _match(self, request: Request) -> Optional[CacheRule]:
+        if request.method not in ("GET", "HEAD"):
+            return None
+        for pattern, rule in self.rules:
+            if pattern.search(request.url.path):
+                return rule
+        return None
+
+    async def dispatch(self, request: Request, call_next):
+        rule = self._match(request)
+        if rule is None:
+            return await call_next(request)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CatalogVersion.name, CatalogVersion.version, CatalogVersion.updated_at)
+                .where(CatalogVersion.name.in_(rule.catalogs))
+            )
+            versions = {row.name: (row.version, row.updated_at) for row in result}
+
+        etag = self._etag(request, rule, versions)
+        last_modified = self._last_modified(versions)
+
+        headers = {"ETag": etag, "Cache-Control": rule.cache_control}
+        if last_modified:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        if self._not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def _etag(request: Request, rule: CacheRule, versions: dict) -> str:
+        parts = [request.url.path, str(request.url.query)]
+        parts += [f"{name}:{versions.get(name, (0, None))[0]}" for name in rule.catalogs]
+        return '"' + hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20] + '"'
+
+    @staticmethod
+    def _last_modified(versions: dict) -> Optional[datetime]:
+        stamps = [updated_at for _, updated_at in versions.values() if updated_at]
+        if not stamps:
+            return None
+        # ISO timestamps are naive UTC; HTTP dates have second resolution
+        return datetime.fromisoformat(max(stamps)).replace(tzinfo=timezone.utc, microsecond=0)
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since; GET uses weak comparison
+            tags: List[str] = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return last_modified <= since
+
+        return False
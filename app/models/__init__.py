@@ -1,15 +1,23 @@
 from app.models.product import Product
+from app.models.product_attributes import ProductAttributes
 from app.models.preset import Preset
 from app.models.inquiry import Inquiry, InquiryB2BDetails
 from app.models.user import User
 from app.models.configuration import Configuration
+from app.models.catalog_version import CatalogVersion
+from app.models.price_history import PriceHistory
+from app.models.recommendation_bucket import RecommendationBucket
 
 __all__ = [
     "Product",
+    "ProductAttributes",
     "Preset",
     "Inquiry",
     "InquiryB2BDetails",
     "User",
     "Configuration",
+    "CatalogVersion",
+    "PriceHistory",
+    "RecommendationBucket",
 ]
 
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer
+from app.core.database import Base
+
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    # Catalog name, e.g. "products"
+    name = Column(String(50), primary_key=True)
+
+    # Monotonic counter, bumped in the same transaction as every catalog write
+    version = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    updated_at = Column(String, nullable=True)  # ISO format
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class PriceHistory(Base):
+    """
+    Append-only log of product price changes.
+    One row per change: integer day and price in grosze keep rows small;
+    the price holds from `day` until the next row for the product.
+    """
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_product_day", "product_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+
+    day = Column(Integer, nullable=False)  # days since 1970-01-01 (UTC)
+    price = Column(Integer, nullable=False)  # grosze (1/100 PLN)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, Integer, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class ProductAttributes(Base):
+    """
+    Typed attributes parsed from Product.specifications.
+    Written together with the product so range filters and compatibility
+    checks never have to parse display strings like "16 GB" or "281 mm".
+    """
+    __tablename__ = "product_attributes"
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+
+    # Platform
+    socket = Column(String(20), nullable=True, index=True)  # CPU, motherboard
+    supported_sockets = Column(JSON, nullable=True)  # cooler: ["AM5", "LGA1700"]
+    ram_type = Column(String(10), nullable=True, index=True)  # RAM, motherboard: DDR4, DDR5
+    ram_slots = Column(Integer, nullable=True)
+    max_ram_speed_mhz = Column(Integer, nullable=True)
+    form_factor = Column(String(20), nullable=True, index=True)  # motherboard format / largest board a case fits
+
+    # Performance
+    cores = Column(Integer, nullable=True)
+    threads = Column(Integer, nullable=True)
+    base_clock_mhz = Column(Integer, nullable=True)
+    boost_clock_mhz = Column(Integer, nullable=True)
+    benchmark_points = Column(Integer, nullable=True, index=True)
+    vram_gb = Column(Integer, nullable=True, index=True)
+    capacity_gb = Column(Integer, nullable=True, index=True)  # RAM, storage
+    speed_mhz = Column(Integer, nullable=True)  # RAM
+    pcie_gen = Column(Integer, nullable=True)  # storage
+    read_speed_mbps = Column(Integer, nullable=True)
+
+    # Power
+    tdp_w = Column(Integer, nullable=True, index=True)  # CPU/GPU draw, cooler capacity
+    wattage_w = Column(Integer, nullable=True, index=True)  # PSU
+
+    # Dimensions
+    length_mm = Column(Integer, nullable=True, index=True)  # GPU
+    height_mm = Column(Integer, nullable=True)  # cooler
+    radiator_mm = Column(Integer, nullable=True)  # AiO cooler
+    max_gpu_length_mm = Column(Integer, nullable=True)  # case
+    max_cooler_height_mm = Column(Integer, nullable=True)  # case
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, Enum as SQLEnum
+from app.core.database import Base
+from app.models.preset import DeviceType, PresetSegment
+
+
+class RecommendationBucket(Base):
+    """
+    Precomputed preset recommendations, run-length encoded over budget steps.
+    A row holds the result for budgets from `budget` up to the next row of
+    the same (device_type, segment); budget -1 holds the result without a
+    budget. The refresh job rewrites the table as a whole and each worker
+    keeps a copy of it in memory.
+    """
+    __tablename__ = "recommendation_buckets"
+
+    device_type = Column(SQLEnum(DeviceType), primary_key=True)
+    segment = Column(SQLEnum(PresetSegment), primary_key=True)
+    budget = Column(Integer, primary_key=True)  # PLN, a multiple of the budget step
+
+    # Comma-separated preset ids, in recommendation order
+    preset_ids = Column(String, nullable=False)
+
+    # "<presets version>:<products version>" the row was computed at
+    source = Column(String(50), nullable=False)
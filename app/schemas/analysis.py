@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.models.preset import PresetSegment
+from app.schemas.product import ProductCompactResponse
+
+
+class BottleneckRequest(BaseModel):
+    cpu_id: UUID
+    gpu_id: UUID
+    resolution: str = Field("1440p", pattern="^(1080p|1440p|4k)$")
+    segment: PresetSegment = PresetSegment.GAMING
+    limit: int = Field(5, ge=1, le=20)
+
+
+class BalancedAlternative(BaseModel):
+    product: ProductCompactResponse
+    bottleneck_percent: int
+
+
+class BottleneckResponse(BaseModel):
+    cpu_id: UUID
+    gpu_id: UUID
+    resolution: str
+    segment: PresetSegment
+    bottleneck_percent: Optional[int] = None  # how far the weaker part falls behind the stronger one; None when unknown
+    limiting_component: Optional[str] = None  # cpu or gpu; None when balanced or unknown
+    by_resolution: Dict[str, int] = Field(default_factory=dict)
+    alternatives: List[BalancedAlternative] = Field(default_factory=list)  # for the limiting component
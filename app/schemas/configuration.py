@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 
+from app.schemas.product import ProductCompactResponse
+
 
 class ConfigurationCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -45,3 +47,23 @@ class ConfigurationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class UpgradeSwap(BaseModel):
+    component_type: str
+    current: Optional[ProductCompactResponse] = None
+    replacement: ProductCompactResponse
+
+
+class UpgradeOption(BaseModel):
+    swaps: List[UpgradeSwap]
+    cost: float  # price of the new parts
+    score_gain: float  # build score points under the segment weights
+    gain_per_1000_pln: float
+
+
+class UpgradePlanResponse(BaseModel):
+    configuration_id: UUID
+    budget: float
+    upgrades: List[UpgradeOption] = Field(default_factory=list)
+    duration_ms: float
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+from app.models.preset import PresetSegment
+from app.schemas.product import PsuCandidate
+from app.schemas.validation import ValidationIssue
+
+
+class ConfiguratorMessage(BaseModel):
+    """Client -> server message of the live configurator WebSocket"""
+    action: str = Field(..., pattern="^(set|load|segment|refresh)$")
+    slot: Optional[str] = None  # set: component type to change
+    product_id: Optional[str] = None  # set: new product, null clears the slot
+    components: Optional[Dict[str, str]] = None  # load: replace the whole build
+    segment: Optional[PresetSegment] = None  # segment: weights for performance_score
+
+
+class ConfiguratorState(BaseModel):
+    """Server -> client build state, sent after every change"""
+    type: str = "state"
+    components: Dict[str, str] = Field(default_factory=dict)
+    segment: PresetSegment
+    is_valid: bool
+    issues: List[ValidationIssue] = Field(default_factory=list)
+    total_power_consumption: Optional[float] = None
+    recommended_psu_wattage: Optional[float] = None
+    psu_candidates: List[PsuCandidate] = Field(default_factory=list)
+    total_price: float = 0.0
+    performance_score: Optional[float] = None
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Keyset-paginated response envelope"""
+    items: List[T] = Field(default_factory=list)
+    next_cursor: Optional[str] = None  # None on the last page
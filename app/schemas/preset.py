@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 from app.models.preset import DeviceType, PresetSegment
-from app.schemas.product import ProductResponse
+from app.schemas.product import ProductResponse, ProductCompactResponse
 
 
 class PresetQuery(BaseModel):
@@ -49,3 +49,18 @@ class PresetResponse(BaseModel):
 class PresetDetailResponse(PresetResponse):
     """Preset response with full product details"""
     products: List[ProductResponse] = Field(default_factory=list)
+
+
+class GeneratedBuild(BaseModel):
+    """Build assembled from the catalog by the build generator"""
+    component_map: Dict[str, str] = Field(default_factory=dict)  # component_type -> product_id
+    products: List[ProductCompactResponse] = Field(default_factory=list)
+    total_price: float
+    performance_score: float
+
+
+class GeneratedBuildsResponse(BaseModel):
+    builds: List[GeneratedBuild] = Field(default_factory=list)  # best first
+    explored: int  # search nodes visited
+    truncated: bool = False  # time budget ran out; builds are the best found until then
+    duration_ms: float
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
+from datetime import date
 from app.models.product import ProductType, ProductSegment
 
 
@@ -55,3 +56,134 @@ class ProductResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class ProductCompactResponse(BaseModel):
+    """Grid/list projection of a product, without specs and description"""
+    id: UUID
+    name: str
+    type: ProductType
+    price: float
+    currency: str
+    image_url: Optional[str]
+    in_stock: bool
+
+    class Config:
+        from_attributes = True
+
+
+class ProductProjection(BaseModel):
+    """
+    Product projected by `fields=` or `view=compact`. Only the requested
+    fields are sent (id always); the rest are absent, not null.
+    """
+    id: UUID
+    name: Optional[str] = None
+    type: Optional[ProductType] = None
+    segment: Optional[ProductSegment] = None
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    specifications: Optional[Dict[str, Any]] = None
+    compatibility: Optional[Dict[str, Any]] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    image_url: Optional[str] = None
+    description: Optional[str] = None
+    in_stock: Optional[bool] = None
+    performance_score: Optional[float] = None
+    gaming_score: Optional[float] = None
+    productivity_score: Optional[float] = None
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse] = Field(default_factory=list)  # in request order
+    missing: List[UUID] = Field(default_factory=list)
+
+
+class PsuCandidate(BaseModel):
+    id: UUID
+    name: str
+    price: float
+    currency: str
+    wattage_w: int
+    image_url: Optional[str] = None
+
+
+class AlternativeProduct(BaseModel):
+    """Replacement for a build component, ranked by value"""
+    product: ProductCompactResponse
+    value_score: float  # 0-100
+    score: Optional[float] = None  # component score; None for parts that aren't scored
+    score_delta: Optional[float] = None
+    build_score_delta: Optional[float] = None  # change of the build score under the segment weights
+    price_delta: float
+    reasons: List[str] = Field(default_factory=list)
+
+
+class SimilarProduct(BaseModel):
+    product: ProductCompactResponse
+    distance: float  # over standardized specs, 0 = identical
+
+
+class FrontierProduct(BaseModel):
+    """Part no other in-stock part of its type beats on both price and score"""
+    product: ProductCompactResponse
+    score: float
+
+
+class ProductAttributesResponse(BaseModel):
+    """Typed attributes parsed from a product's specifications"""
+    socket: Optional[str] = None
+    supported_sockets: Optional[List[str]] = None
+    ram_type: Optional[str] = None
+    ram_slots: Optional[int] = None
+    max_ram_speed_mhz: Optional[int] = None
+    form_factor: Optional[str] = None
+    cores: Optional[int] = None
+    threads: Optional[int] = None
+    base_clock_mhz: Optional[int] = None
+    boost_clock_mhz: Optional[int] = None
+    benchmark_points: Optional[int] = None
+    vram_gb: Optional[int] = None
+    capacity_gb: Optional[int] = None
+    speed_mhz: Optional[int] = None
+    pcie_gen: Optional[int] = None
+    read_speed_mbps: Optional[int] = None
+    tdp_w: Optional[int] = None
+    wattage_w: Optional[int] = None
+    length_mm: Optional[int] = None
+    height_mm: Optional[int] = None
+    radiator_mm: Optional[int] = None
+    max_gpu_length_mm: Optional[int] = None
+    max_cooler_height_mm: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class FacetsResponse(BaseModel):
+    total: int  # products matching the full selection
+    facets: Dict[str, List[FacetValue]] = Field(default_factory=dict)
+
+
+class PricePoint(BaseModel):
+    """Price over one bucket; `price` is the price in effect at the end of it"""
+    date: date  # first day of the bucket
+    price: float
+    min_price: float
+    max_price: float
+
+
+class PriceHistoryResponse(BaseModel):
+    product_id: UUID
+    resolution: str  # day, week or month
+    points: List[PricePoint] = Field(default_factory=list)
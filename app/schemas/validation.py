@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Dict, List, Any, Optional
 
+from app.schemas.product import PsuCandidate
+
 
 class ValidationRequest(BaseModel):
     components: Dict[str, str] = Field(..., description="Component type -> product ID mapping")
@@ -13,6 +15,15 @@ class ValidationIssue(BaseModel):
     severity: str  # error, warning
     message: str
     details: Optional[Dict[str, Any]] = None
+    rule: Optional[str] = None  # rule that raised the issue
+
+
+class RuleTrace(BaseModel):
+    """One compatibility rule evaluated during validation"""
+    rule: str
+    slots: List[str]
+    passed: bool
+    duration_ms: float
 
 
 class ValidationResponse(BaseModel):
@@ -21,4 +32,26 @@ class ValidationResponse(BaseModel):
     total_power_consumption: Optional[float] = None
     recommended_psu_wattage: Optional[float] = None
     performance_score: Optional[float] = None
+    rules: List[RuleTrace] = Field(default_factory=list)  # rules that ran, in evaluation order
+    cached: bool = False  # served from the validation cache; rule durations are those of the original run
+    state: Optional[str] = None  # token for POST /validate/delta
+    psu_candidates: List[PsuCandidate] = Field(default_factory=list)  # cheapest in-stock PSUs covering recommended wattage
+
+
+class DeltaValidationRequest(BaseModel):
+    state: str = Field(..., description="`state` of the previous validation response")
+    slot: str = Field(..., description="Component type that changed")
+    product_id: Optional[str] = Field(None, description="New product for the slot, null to clear it")
+
+
+
+class BatchValidationRequest(BaseModel):
+    configurations: List[Dict[str, str]] = Field(..., min_length=1, max_length=500)
+
 
+class BatchValidationResponse(BaseModel):
+    results: List[ValidationResponse] = Field(default_factory=list)  # in request order
+    valid_count: int
+    invalid_count: int
+    product_count: int  # distinct catalog products used by the configurations
+    duration_ms: float
@@ -0,0 +1,285 @@
+from typing import Any, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.models.preset import PresetSegment
+from app.models.product import ProductType
+from app.services.catalog import CatalogSnapshot
+from app.services.rules import PAIR_RULES, POWER_RULE, PairRule
+from app.services.scoring import component_score, segment_weights
+
+BLOCKING_RULES: List[PairRule] = [rule for rule in PAIR_RULES if rule.severity == "error"]
+
+# Share of price/performance in the value score of scored parts (the rest is raw performance)
+VALUE_WEIGHT = 0.4
+
+# Specs compared in the reasons, higher is better
+SPEC_LABELS: Dict[ProductType, Dict[str, str]] = {
+    ProductType.CPU: {"cores": "Rdzenie", "boost_clock_mhz": "Taktowanie boost (MHz)"},
+    ProductType.GPU: {"vram_gb": "Pamięć VRAM (GB)"},
+    ProductType.RAM: {"capacity_gb": "Pojemność (GB)", "speed_mhz": "Szybkość (MHz)"},
+    ProductType.STORAGE: {"capacity_gb": "Pojemność (GB)", "read_speed_mbps": "Odczyt (MB/s)"},
+    ProductType.PSU: {"wattage_w": "Moc (W)"},
+}
+
+
+class Alternative(NamedTuple):
+    product_id: UUID
+    value_score: float
+    score: Optional[float]
+    score_delta: Optional[float]
+    build_score_delta: Optional[float]
+    price_delta: float
+    reasons: List[str]
+
+
+def _fields(product_type: ProductType) -> Dict[str, str]:
+    """Attributes of a type read by the blocking rules, power check and reasons, with their column kind"""
+    kinds = {"eq": ("code", "code"), "le": ("number", "number"), "member": ("code", "list")}
+    fields: Dict[str, str] = {}
+    for rule in BLOCKING_RULES:
+        left_kind, right_kind = kinds[rule.op]
+        if rule.left_slot == product_type:
+            fields[rule.left_field] = left_kind
+        if rule.right_slot == product_type:
+            fields[rule.right_field] = right_kind
+    if product_type in POWER_RULE.draw_slots:
+        fields[POWER_RULE.draw_field] = "number"
+    if product_type == POWER_RULE.supply_slot:
+        fields[POWER_RULE.supply_field] = "number"
+    for field in SPEC_LABELS.get(product_type, {}):
+        fields.setdefault(field, "number")
+    return fields
+
+
+class TypeArrays:
+    """
+    Column arrays of the products of one type, one row per product.
+    Categorical attributes are stored as integer codes (-1 when missing),
+    list attributes as a product x code boolean matrix, numbers as floats
+    (NaN when missing).
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot, product_type: ProductType, codes: Dict[Any, int]):
+        products = snapshot.by_type.get(product_type, [])
+        attributes = [snapshot.attributes_of(product.id) for product in products]
+        size = len(products)
+
+        self.ids: List[UUID] = [product.id for product in products]
+        self.rows: Dict[UUID, int] = {product_id: row for row, product_id in enumerate(self.ids)}
+        self.price = np.array([product.price for product in products], dtype=np.float64)
+        self.in_stock = np.array([product.in_stock for product in products], dtype=bool)
+        scores = [
+            component_score(product_type, product.name, attrs.model_dump(exclude_none=True))
+            for product, attrs in zip(products, attributes)
+        ]
+        self.score = np.array([np.nan if s is None else s for s in scores], dtype=np.float64)
+
+        self.numbers: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.lists: Dict[str, List[List[int]]] = {}
+        for field, kind in _fields(product_type).items():
+            values = [getattr(attrs, field) for attrs in attributes]
+            if kind == "number":
+                self.numbers[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif kind == "code":
+                self.codes[field] = np.array(
+                    [codes.setdefault(v, len(codes)) if v else -1 for v in values], dtype=np.int64
+                )
+            else:
+                self.lists[field] = [[codes.setdefault(v, len(codes)) for v in (value or [])] for value in values]
+        self.size = size
+
+    def member_matrix(self, field: str, width: int) -> np.ndarray:
+        """Boolean matrix of a list attribute (rows x codes), plus a trailing 'list is empty' column"""
+        matrix = np.zeros((self.size, width + 1), dtype=bool)
+        for row, values in enumerate(self.lists[field]):
+            if values:
+                matrix[row, values] = True
+            else:
+                matrix[row, width] = True
+        return matrix
+
+
+class AlternativesIndex:
+    """
+    NumPy arrays of the whole catalog for the "Replace component" feature.
+    Scoring and the compatibility check against the rest of the build are
+    one vectorized pass over the arrays of the replaced component's type.
+    Rebuilt once per catalog version.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.codes: Dict[Any, int] = {}
+        self.types: Dict[ProductType, TypeArrays] = {
+            product_type: TypeArrays(snapshot, product_type, self.codes) for product_type in ProductType
+        }
+        # Code set last, once the vocabulary is complete
+        self.members: Dict[tuple, np.ndarray] = {
+            (product_type, field): arrays.member_matrix(field, len(self.codes))
+            for product_type, arrays in self.types.items()
+            for field in arrays.lists
+        }
+
+    def _code(self, value: Any) -> int:
+        return self.codes.get(value, len(self.codes))  # unknown value matches no product
+
+    def _pair_mask(self, target: ProductType, rule: PairRule, other_id: UUID) -> Optional[np.ndarray]:
+        arrays = self.types[target]
+        attributes = self.snapshot.attributes_of(other_id)
+        target_is_left = rule.left_slot == target
+        field = rule.left_field if target_is_left else rule.right_field
+        value = getattr(attributes, rule.right_field if target_is_left else rule.left_field)
+        if value is None or value == "" or value == []:
+            return None  # rules are skipped when an attribute is missing
+
+        if rule.op == "eq":
+            codes = arrays.codes[field]
+            return (codes == -1) | (codes == self._code(value))
+        if rule.op == "le":
+            numbers = arrays.numbers[field]
+            with np.errstate(invalid="ignore"):
+                return np.isnan(numbers) | (numbers <= value if target_is_left else numbers >= value)
+        # member: the left scalar must be in the right list
+        if target_is_left:
+            codes = arrays.codes[field]
+            return (codes == -1) | np.isin(codes, [self._code(v) for v in value])
+        members = self.members[(target, field)]
+        code = self.codes.get(value)
+        empty = members[:, -1]
+        return empty if code is None else empty | members[:, code]
+
+    def _power_mask(self, target: ProductType, selected: Dict[ProductType, UUID]) -> Optional[np.ndarray]:
+        draws = {
+            slot: getattr(self.snapshot.attributes_of(product_id), POWER_RULE.draw_field)
+            for slot, product_id in selected.items()
+            if slot in POWER_RULE.draw_slots
+        }
+        draws = {slot: draw for slot, draw in draws.items() if draw}
+        supply_id = selected.get(POWER_RULE.supply_slot)
+        supply = getattr(self.snapshot.attributes_of(supply_id), POWER_RULE.supply_field) if supply_id else None
+
+        arrays = self.types[target]
+        with np.errstate(invalid="ignore"):
+            if target == POWER_RULE.supply_slot and draws:
+                wattage = arrays.numbers[POWER_RULE.supply_field]
+                return np.isnan(wattage) | (wattage >= sum(draws.values()))
+            if target in POWER_RULE.draw_slots and supply:
+                draw = arrays.numbers[POWER_RULE.draw_field]
+                available = supply - sum(d for slot, d in draws.items() if slot != target)
+                return np.isnan(draw) | (draw <= available)
+        return None
+
+    def compatible_mask(self, target: ProductType, selected: Dict[ProductType, UUID]) -> np.ndarray:
+        """Rows of `target` that pass every blocking rule and the PSU check against the selected parts"""
+        mask = np.ones(self.types[target].size, dtype=bool)
+        for rule in BLOCKING_RULES:
+            if rule.left_slot == target and rule.right_slot in selected:
+                other = selected[rule.right_slot]
+            elif rule.right_slot == target and rule.left_slot in selected:
+                other = selected[rule.left_slot]
+            else:
+                continue
+            rule_mask = self._pair_mask(target, rule, other)
+            if rule_mask is not None:
+                mask &= rule_mask
+        power_mask = self._power_mask(target, selected)
+        if power_mask is not None:
+            mask &= power_mask
+        return mask
+
+    def alternatives(
+        self,
+        current_id: UUID,
+        selected: Dict[ProductType, UUID],
+        segment: Optional[PresetSegment] = None,
+        budget: Optional[float] = None,
+        limit: int = 5,
+    ) -> List[Alternative]:
+        """
+        Top in-stock replacements for a product that fit the rest of the
+        build and, with `budget`, keep the build's total price within it.
+        Scored parts are ranked by performance blended with performance per
+        PLN, unscored ones (motherboard, PSU, case, cooler) by price.
+        """
+        current = self.snapshot.get(current_id)
+        target = current.type
+        arrays = self.types[target]
+        row = arrays.rows[current_id]
+        others = {slot: pid for slot, pid in selected.items() if slot != target}
+
+        mask = arrays.in_stock & self.compatible_mask(target, others)
+        mask[row] = False
+        if budget is not None:
+            rest = sum(self.snapshot.get(pid).price for pid in others.values())
+            mask &= arrays.price <= budget - rest
+        candidates = np.flatnonzero(mask)
+        if not candidates.size:
+            return []
+
+        price = arrays.price[candidates]
+        score = arrays.score[candidates]
+        scored = not np.isnan(arrays.score[row])
+        if scored:
+            per_pln = score / np.maximum(price, 1)
+            value = (1 - VALUE_WEIGHT) * score / 100 + VALUE_WEIGHT * per_pln / per_pln.max()
+        else:
+            value = price.min() / np.maximum(price, 1)
+
+        # Best value first, cheaper on ties
+        top = np.lexsort((price, -value))[:limit]
+        best_value = value.max()
+        weight = segment_weights(segment).get(target, 0)
+        current_price = arrays.price[row]
+        current_score = arrays.score[row]
+
+        result = []
+        for position in top:
+            index = candidates[position]
+            price_delta = float(arrays.price[index] - current_price)
+            score_delta = float(arrays.score[index] - current_score) if scored else None
+            result.append(Alternative(
+                product_id=arrays.ids[index],
+                value_score=round(float(value[position]) * 100, 2),
+                score=float(arrays.score[index]) if scored else None,
+                score_delta=score_delta,
+                build_score_delta=round(score_delta * weight, 2) if scored else None,
+                price_delta=round(price_delta, 2),
+                reasons=self._reasons(target, row, index, price_delta, score_delta, value[position] == best_value, bool(others)),
+            ))
+        return result
+
+    def _reasons(
+        self,
+        target: ProductType,
+        row: int,
+        index: int,
+        price_delta: float,
+        score_delta: Optional[float],
+        best_value: bool,
+        checked: bool,
+    ) -> List[str]:
+        arrays = self.types[target]
+        reasons = []
+        if best_value:
+            reasons.append("Najlepszy stosunek ceny do wydajności" if score_delta is not None else "Najtańsza opcja")
+        if score_delta:
+            label = "Wyższa" if score_delta > 0 else "Niższa"
+            reasons.append(f"{label} wydajność ({score_delta:+.0f} pkt)")
+        for field, name in SPEC_LABELS.get(target, {}).items():
+            old, new = arrays.numbers[field][row], arrays.numbers[field][index]
+            if not np.isnan(new) and (np.isnan(old) or new > old):
+                reasons.append(f"{name}: {new:.0f}" + ("" if np.isnan(old) else f" (obecnie {old:.0f})"))
+        if price_delta < 0:
+            reasons.append(f"Tańszy o {-price_delta:.0f} zł")
+        elif price_delta > 0:
+            reasons.append(f"Droższy o {price_delta:.0f} zł")
+        if checked:
+            reasons.append("Zgodny z pozostałymi komponentami")
+        return reasons
+
+
+def get_alternatives_index(snapshot: CatalogSnapshot) -> AlternativesIndex:
+    return snapshot.derived("alternatives", AlternativesIndex)
@@ -0,0 +1,159 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.models.preset import PresetSegment
+from app.models.product import ProductType
+from app.schemas.product import ProductResponse
+from app.services.catalog import CatalogSnapshot
+from app.services.scoring import component_score
+
+# How far a CPU's score stretches per resolution tier: fewer frames to prepare at higher resolutions
+RESOLUTION_CPU_FACTORS: Dict[str, float] = {
+    "1080p": 1.0,
+    "1440p": 1.3,
+    "4k": 1.7,
+}
+
+# How much GPU each segment asks for; a weak GPU holds back games more than office work
+SEGMENT_GPU_DEMAND: Dict[PresetSegment, float] = {
+    PresetSegment.GAMING: 1.0,
+    PresetSegment.HOME: 0.9,
+    PresetSegment.PRO: 0.8,
+    PresetSegment.BUSINESS: 0.6,
+}
+
+# Pairs at or under this bottleneck count as balanced
+BALANCED_PERCENT = 10
+
+# Bottleneck stored for pairs with a part of unknown strength; above any real percent, so they sort last
+UNKNOWN_PERCENT = 255
+
+
+def _strengths(slot: ProductType, products: List[ProductResponse], snapshot: CatalogSnapshot) -> np.ndarray:
+    """
+    Strength (0-100) of each part, NaN where unknown. Stored scores come
+    first, then the score tables; parts in neither are placed on the same
+    scale from their benchmark points, by a linear fit over the parts that
+    have both. Parts with none of these stay unknown rather than getting
+    the placeholder default score.
+    """
+    attributes = [snapshot.attributes_of(product.id) for product in products]
+    scores = np.array([
+        next((score for score in (
+            product.gaming_score,
+            product.performance_score,
+            component_score(slot, product.name, attrs.model_dump(exclude_none=True), default=None),
+        ) if score is not None), np.nan)
+        for product, attrs in zip(products, attributes)
+    ], dtype=np.float64)
+    points = np.array([
+        np.nan if attrs.benchmark_points is None else attrs.benchmark_points for attrs in attributes
+    ], dtype=np.float64)
+
+    calibration = ~np.isnan(scores) & ~np.isnan(points)
+    if np.unique(points[calibration]).size >= 2:
+        slope, intercept = np.polyfit(points[calibration], scores[calibration], 1)
+        from_points = np.isnan(scores) & ~np.isnan(points)
+        scores[from_points] = np.clip(points[from_points] * slope + intercept, 0, 100)
+    return scores
+
+
+class BalanceTable(NamedTuple):
+    bottleneck: np.ndarray  # CPU x GPU, percent (uint8)
+    cpu_limited: np.ndarray  # CPU x GPU, True where the CPU is the weaker side
+    gpu_order: np.ndarray  # per CPU row: GPU columns, best balanced (then cheapest) first
+    cpu_order: np.ndarray  # per GPU column: CPU rows, best balanced (then cheapest) first
+
+
+class Bottleneck(NamedTuple):
+    percent: Optional[int]  # None when either part's strength is unknown
+    limiting: Optional[ProductType]  # None when balanced or unknown
+    by_resolution: Dict[str, int]
+    alternatives: List[Tuple[UUID, int]]  # better-balanced parts for the limiting slot, with their bottleneck
+
+
+class BalanceMatrix:
+    """
+    CPU-GPU bottleneck of every catalog CPU with every catalog GPU, per
+    resolution tier and segment. The effective CPU score is scaled by the
+    resolution, the effective GPU score by the segment's GPU demand; the
+    bottleneck is how far the weaker side falls behind the stronger one.
+    Built once per catalog version, so an analysis is a few lookups.
+    Pairs with a part of unknown strength hold UNKNOWN_PERCENT.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.ids: Dict[ProductType, List[UUID]] = {}
+        self.rows: Dict[ProductType, Dict[UUID, int]] = {}
+        self.price: Dict[ProductType, np.ndarray] = {}
+        self.in_stock: Dict[ProductType, np.ndarray] = {}
+        self.known: Dict[ProductType, np.ndarray] = {}
+        scores: Dict[ProductType, np.ndarray] = {}
+        for slot in (ProductType.CPU, ProductType.GPU):
+            products = snapshot.by_type.get(slot, [])
+            self.ids[slot] = [product.id for product in products]
+            self.rows[slot] = {product.id: row for row, product in enumerate(products)}
+            self.price[slot] = np.array([product.price for product in products], dtype=np.float64)
+            self.in_stock[slot] = np.array([product.in_stock for product in products], dtype=bool)
+            strengths = _strengths(slot, products, snapshot)
+            self.known[slot] = ~np.isnan(strengths)
+            scores[slot] = np.nan_to_num(strengths)
+
+        cpu_price = self.price[ProductType.CPU]
+        gpu_price = self.price[ProductType.GPU]
+        unknown = ~(self.known[ProductType.CPU][:, None] & self.known[ProductType.GPU][None, :])
+        self.tables: Dict[Tuple[str, PresetSegment], BalanceTable] = {}
+        for resolution, cpu_factor in RESOLUTION_CPU_FACTORS.items():
+            for segment, gpu_demand in SEGMENT_GPU_DEMAND.items():
+                cpu = scores[ProductType.CPU][:, None] * cpu_factor
+                gpu = scores[ProductType.GPU][None, :] / gpu_demand
+                stronger = np.maximum(np.maximum(cpu, gpu), 1)
+                bottleneck = np.rint(np.abs(cpu - gpu) / stronger * 100).astype(np.uint8)
+                bottleneck[unknown] = UNKNOWN_PERCENT
+                self.tables[(resolution, segment)] = BalanceTable(
+                    bottleneck=bottleneck,
+                    cpu_limited=cpu < gpu,
+                    gpu_order=np.lexsort((np.broadcast_to(gpu_price, bottleneck.shape), bottleneck), axis=1),
+                    cpu_order=np.lexsort((np.broadcast_to(cpu_price[:, None], bottleneck.shape), bottleneck), axis=0),
+                )
+
+    def analyze(
+        self,
+        cpu_id: UUID,
+        gpu_id: UUID,
+        resolution: str,
+        segment: PresetSegment,
+        limit: int = 5,
+    ) -> Bottleneck:
+        """Bottleneck of a CPU-GPU pair and in-stock replacements for the weaker side that balance better"""
+        cpu = self.rows[ProductType.CPU][cpu_id]
+        gpu = self.rows[ProductType.GPU][gpu_id]
+        if not (self.known[ProductType.CPU][cpu] and self.known[ProductType.GPU][gpu]):
+            return Bottleneck(None, None, {}, [])
+        table = self.tables[(resolution, segment)]
+        percent = int(table.bottleneck[cpu, gpu])
+        by_resolution = {tier: int(self.tables[(tier, segment)].bottleneck[cpu, gpu]) for tier in RESOLUTION_CPU_FACTORS}
+
+        if percent <= BALANCED_PERCENT:
+            return Bottleneck(percent, None, by_resolution, [])
+
+        if table.cpu_limited[cpu, gpu]:
+            limiting, order, bottlenecks = ProductType.CPU, table.cpu_order[:, gpu], table.bottleneck[:, gpu]
+        else:
+            limiting, order, bottlenecks = ProductType.GPU, table.gpu_order[cpu], table.bottleneck[cpu]
+
+        alternatives = []
+        in_stock = self.in_stock[limiting]
+        for row in order:
+            if bottlenecks[row] >= percent or len(alternatives) == limit:
+                break
+            if in_stock[row]:
+                alternatives.append((self.ids[limiting][row], int(bottlenecks[row])))
+        return Bottleneck(percent, limiting, by_resolution, alternatives)
+
+
+def get_balance_matrix(snapshot: CatalogSnapshot) -> BalanceMatrix:
+    return snapshot.derived("balance_matrix", BalanceMatrix)
@@ -0,0 +1,255 @@
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.preset import PresetSegment
+from app.models.product import ProductType
+from app.schemas.product import ProductAttributesResponse
+from app.services.catalog import CatalogSnapshot
+from app.services.compatibility import get_compatibility_matrix, CompatibilityMatrix
+from app.services.rules import PAIR_RULES, POWER_RULE, PairRule
+from app.services.scoring import component_score, segment_weights
+
+# Search order: constrained platform parts first so incompatible branches are cut early
+BUILD_SLOTS: List[ProductType] = [
+    ProductType.CPU,
+    ProductType.MOTHERBOARD,
+    ProductType.RAM,
+    ProductType.GPU,
+    ProductType.COOLER,
+    ProductType.CASE,
+    ProductType.STORAGE,
+    ProductType.PSU,
+]
+
+BLOCKING_RULES: List[PairRule] = [rule for rule in PAIR_RULES if rule.severity == "error"]
+
+DEADLINE_CHECK_NODES = 64
+
+
+class Candidate(NamedTuple):
+    id: UUID
+    price: float
+    score: float  # component score (0-100), 0 for parts that don't count towards the build score
+    attributes: ProductAttributesResponse
+
+
+class Build(NamedTuple):
+    score: float
+    price: float
+    parts: Dict[ProductType, Candidate]
+
+
+def _signature(product_type: ProductType, attributes: ProductAttributesResponse) -> tuple:
+    """Attributes of a part that any blocking rule or the power check reads"""
+    fields = [rule.left_field for rule in BLOCKING_RULES if rule.left_slot == product_type]
+    fields += [rule.right_field for rule in BLOCKING_RULES if rule.right_slot == product_type]
+    if product_type in POWER_RULE.draw_slots:
+        fields.append(POWER_RULE.draw_field)
+    if product_type == POWER_RULE.supply_slot:
+        fields.append(POWER_RULE.supply_field)
+    values = (getattr(attributes, field) for field in sorted(set(fields)))
+    return tuple(tuple(value) if isinstance(value, list) else value for value in values)
+
+
+class BuildCandidates:
+    """
+    Per-slot candidate lists for the build search, kept per catalog version.
+    Parts with the same compatibility signature are interchangeable for the
+    rules, so within a signature only the price/score Pareto front is kept:
+    the cheapest part for unscored slots, better-scoring ones only if
+    pricier. Lists are ordered best score first, then cheapest. Catalog
+    changes re-group only the changed parts and re-sort only their slots.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.matrix: CompatibilityMatrix = get_compatibility_matrix(snapshot)
+        self.slots: Dict[ProductType, List[Candidate]] = {}
+        self.groups: Dict[ProductType, Dict[tuple, Dict[UUID, Candidate]]] = {slot: defaultdict(dict) for slot in BUILD_SLOTS}
+        self.entries: Dict[UUID, Tuple[ProductType, tuple]] = {}
+
+        for slot in BUILD_SLOTS:
+            for product in snapshot.select(slot, in_stock=True):
+                self._add(snapshot, product.id)
+            self._select(slot)
+
+        # Blocking rules between each slot and the slots chosen before it
+        self.checks: Dict[ProductType, List[Tuple[PairRule, ProductType, bool]]] = {}
+        for index, slot in enumerate(BUILD_SLOTS):
+            earlier = BUILD_SLOTS[:index]
+            self.checks[slot] = [
+                (rule, rule.right_slot, True) for rule in BLOCKING_RULES
+                if rule.left_slot == slot and rule.right_slot in earlier
+            ] + [
+                (rule, rule.left_slot, False) for rule in BLOCKING_RULES
+                if rule.right_slot == slot and rule.left_slot in earlier
+            ]
+
+    def _add(self, snapshot: CatalogSnapshot, product_id: UUID) -> Optional[ProductType]:
+        """Group an in-stock build part; returns its slot, or None if it isn't a candidate"""
+        product = snapshot.get(product_id)
+        if product is None or not product.in_stock or product.type not in self.groups:
+            return None
+        attributes = snapshot.attributes_of(product_id)
+        score = component_score(product.type, product.name, attributes.model_dump(exclude_none=True)) or 0
+        signature = _signature(product.type, attributes)
+        self.groups[product.type][signature][product_id] = Candidate(product_id, product.price, score, attributes)
+        self.entries[product_id] = (product.type, signature)
+        return product.type
+
+    def _remove(self, product_id: UUID) -> Optional[ProductType]:
+        entry = self.entries.pop(product_id, None)
+        if entry is None:
+            return None
+        slot, signature = entry
+        group = self.groups[slot][signature]
+        del group[product_id]
+        if not group:
+            del self.groups[slot][signature]
+        return slot
+
+    def _select(self, slot: ProductType) -> None:
+        """Rebuild a slot's candidate list from its signature groups"""
+        kept = []
+        for group in self.groups[slot].values():
+            best = -1.0
+            for candidate in sorted(group.values(), key=lambda c: (c.price, -c.score)):
+                if candidate.score > best:
+                    kept.append(candidate)
+                    best = candidate.score
+        kept.sort(key=lambda c: (-c.score, c.price))
+        self.slots[slot] = kept
+
+    def update(self, snapshot: CatalogSnapshot, changed_ids: Set[UUID]) -> "BuildCandidates":
+        self.matrix = get_compatibility_matrix(snapshot)
+        touched = set()
+        for product_id in changed_ids:
+            touched.add(self._remove(product_id))
+            touched.add(self._add(snapshot, product_id))
+        touched.discard(None)
+        for slot in touched:
+            self._select(slot)
+        return self
+
+    def compatible(self, slot: ProductType, candidate: Candidate, chosen: Dict[ProductType, Candidate]) -> bool:
+        for rule, other_slot, is_left in self.checks[slot]:
+            other = chosen[other_slot].id
+            left, right = (candidate.id, other) if is_left else (other, candidate.id)
+            if self.matrix.compatible(rule, left, right) is False:
+                return False
+        if slot == POWER_RULE.supply_slot:
+            draw = sum(getattr(chosen[s].attributes, POWER_RULE.draw_field) or 0 for s in POWER_RULE.draw_slots)
+            wattage = getattr(candidate.attributes, POWER_RULE.supply_field) or 0
+            # Ask for the headroom validation recommends, so generated builds carry no PSU warning
+            return draw == 0 or wattage >= draw * POWER_RULE.headroom
+        return True
+
+    def generate(
+        self,
+        segment: Optional[PresetSegment],
+        budget: float,
+        limit: int,
+        max_ms: float,
+    ) -> Tuple[List[Build], int, bool]:
+        """
+        Branch-and-bound search for the `limit` best-scoring compatible builds
+        within budget (ties broken by price). Builds are distinct by their
+        scored parts. The search stops after `max_ms` milliseconds with the
+        best builds found so far. Returns the builds, the number of nodes
+        explored and whether the search was cut short.
+        """
+        weights = segment_weights(segment)
+        count = len(BUILD_SLOTS)
+
+        # Optimistic bounds for the slots not chosen yet
+        min_cost = [0.0] * (count + 1)
+        max_gain = [0.0] * (count + 1)
+        for index in range(count - 1, -1, -1):
+            candidates = self.slots[BUILD_SLOTS[index]]
+            if not candidates:
+                return [], 0, False
+            min_cost[index] = min_cost[index + 1] + min(c.price for c in candidates)
+            max_gain[index] = max_gain[index + 1] + weights.get(BUILD_SLOTS[index], 0) * candidates[0].score
+
+        best: Dict[tuple, Build] = {}
+        worst: List[Optional[Tuple[float, float]]] = [None]  # rank of the limit-th build once full
+        chosen: Dict[ProductType, Candidate] = {}
+        explored = 0
+        truncated = False
+        deadline = time.perf_counter() + max_ms / 1000
+
+        def rank(score: float, price: float) -> Tuple[float, float]:
+            return (round(score, 6), -price)
+
+        def record(score: float, price: float) -> None:
+            key = tuple(chosen[slot].id for slot in BUILD_SLOTS if weights.get(slot))
+            if key in best and rank(*best[key][:2]) >= rank(score, price):
+                return
+            best[key] = Build(score, price, dict(chosen))
+            if len(best) > limit:
+                del best[min(best, key=lambda k: rank(*best[k][:2]))]
+            if len(best) == limit:
+                worst[0] = min(rank(b.score, b.price) for b in best.values())
+
+        def search(index: int, cost: float, score: float) -> None:
+            nonlocal explored, truncated
+            if index == count:
+                record(score, cost)
+                return
+
+            slot = BUILD_SLOTS[index]
+            weight = weights.get(slot, 0)
+            last = index == count - 1
+            for candidate in self.slots[slot]:
+                # Reading the clock is not free, so check it every DEADLINE_CHECK_NODES nodes
+                if truncated or (explored % DEADLINE_CHECK_NODES == 0 and time.perf_counter() > deadline):
+                    truncated = True
+                    return
+                explored += 1
+                new_cost = cost + candidate.price
+                new_score = score + weight * candidate.score
+                # Later candidates score lower, or the same for more money: nothing better follows
+                if worst[0] is not None and rank(new_score + max_gain[index + 1], new_cost + min_cost[index + 1]) <= worst[0]:
+                    break
+                if new_cost + min_cost[index + 1] > budget:
+                    continue
+                if not self.compatible(slot, candidate, chosen):
+                    continue
+                chosen[slot] = candidate
+                search(index + 1, new_cost, new_score)
+                del chosen[slot]
+                # An unscored last slot adds nothing to the key: the first (cheapest) fit beats the rest
+                if last and not weight:
+                    break
+
+        search(0, 0.0, 0.0)
+        builds = sorted(best.values(), key=lambda b: rank(b.score, b.price), reverse=True)
+        return builds, explored, truncated
+
+
+def get_build_candidates(snapshot: CatalogSnapshot) -> BuildCandidates:
+    return snapshot.derived(
+        "build_candidates",
+        BuildCandidates,
+        lambda candidates, snapshot, changed_ids: candidates.update(snapshot, changed_ids),
+    )
+
+
+def generate_builds(
+    snapshot: CatalogSnapshot,
+    segment: Optional[PresetSegment],
+    budget: float,
+    limit: int = 3,
+) -> Tuple[List[Build], int, bool, float]:
+    """
+    Best compatible PC builds within budget, searching for at most
+    settings.build_generator_max_ms; returns builds, nodes explored,
+    whether the time budget ran out and duration in ms
+    """
+    started = time.perf_counter()
+    builds, explored, truncated = get_build_candidates(snapshot).generate(
+        segment, budget, limit, settings.build_generator_max_ms
+    )
+    return builds, explored, truncated, round((time.perf_counter() - started) * 1000, 3)
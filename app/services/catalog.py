@@ -0,0 +1,234 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.catalog_version import CatalogVersion
+from app.models.product import Product, ProductType
+from app.models.product_attributes import ProductAttributes
+from app.schemas.product import ProductResponse, ProductAttributesResponse
+from app.services.specs import extract_attributes
+
+PRODUCTS_CATALOG = "products"
+PRESETS_CATALOG = "presets"
+
+# Derived indexes that can be patched for changed products: name -> (build, update)
+_incremental: Dict[str, Tuple[Callable[..., Any], Callable[..., Any]]] = {}
+
+
+class CatalogSnapshot:
+    """
+    In-memory, read-only view of the product catalog at a given version.
+    Products are kept in id order and indexed by type and in_stock,
+    with their typed attributes alongside.
+
+    Services hang their own indexes off a snapshot with derived(); when the
+    snapshot replaces a previous one, those indexes can be patched for the
+    changed products only instead of being rebuilt.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        products: List[ProductResponse],
+        attributes: Dict[UUID, ProductAttributesResponse],
+        previous: Optional["CatalogSnapshot"] = None,
+    ):
+        self.version = version
+        self.products = products
+        self.attributes = attributes
+        self.by_id: Dict[UUID, ProductResponse] = {p.id: p for p in products}
+        self.by_type: Dict[ProductType, List[ProductResponse]] = defaultdict(list)
+        self.by_stock: Dict[Tuple[Optional[ProductType], bool], List[ProductResponse]] = defaultdict(list)
+
+        for product in products:
+            self.by_type[product.type].append(product)
+            self.by_stock[(None, product.in_stock)].append(product)
+            self.by_stock[(product.type, product.in_stock)].append(product)
+
+        self._derived: Dict[str, Any] = {}
+        self._inherited: Dict[str, Any] = {}
+        self.changed_ids: Set[UUID] = set()
+        self.previous_version: Optional[int] = None
+        if previous is not None:
+            self._inherited = previous._derived
+            self.previous_version = previous.version
+            self.changed_ids = self._diff(previous)
+
+    def _diff(self, previous: "CatalogSnapshot") -> Set[UUID]:
+        """Ids of products added, removed or modified since the previous snapshot"""
+        changed = set(previous.by_id) ^ set(self.by_id)
+        for product_id, product in self.by_id.items():
+            old = previous.by_id.get(product_id)
+            if old is not None and (
+                old != product or previous.attributes.get(product_id) != self.attributes.get(product_id)
+            ):
+                changed.add(product_id)
+        return changed
+
+    def get(self, product_id: UUID) -> Optional[ProductResponse]:
+        return self.by_id.get(product_id)
+
+    def attributes_of(self, product_id: UUID) -> ProductAttributesResponse:
+        return self.attributes.get(product_id) or ProductAttributesResponse()
+
+    def derived(
+        self,
+        name: str,
+        build: Callable[["CatalogSnapshot"], Any],
+        update: Optional[Callable[[Any, "CatalogSnapshot", Set[UUID]], Any]] = None,
+    ) -> Any:
+        """
+        Get an index derived from this snapshot, computed once per version.
+        With `update`, the previous snapshot's index is taken over and patched
+        for changed_ids; otherwise it is rebuilt from scratch.
+        """
+        if update is not None:
+            _incremental[name] = (build, update)
+        if name not in self._derived:
+            inherited = self._inherited.pop(name, None)
+            if update is not None and inherited is not None:
+                self._derived[name] = update(inherited, self, self.changed_ids)
+            else:
+                self._derived[name] = build(self)
+        return self._derived[name]
+
+    def carry_over(self) -> None:
+        """
+        Patch the previous snapshot's incremental indexes right away, so they
+        stay warm across versions and no later request pays for a rebuild
+        """
+        for name in list(self._inherited):
+            if name in _incremental and name in self._inherited:
+                self.derived(name, *_incremental[name])
+
+    def select(
+        self,
+        type: Optional[ProductType] = None,
+        in_stock: Optional[bool] = None,
+    ) -> List[ProductResponse]:
+        """Return products matching the filters, in id order"""
+        if in_stock is not None:
+            return self.by_stock.get((type, in_stock), [])
+        if type:
+            return self.by_type.get(type, [])
+        return self.products
+
+
+def _serialize_products(snapshot: CatalogSnapshot) -> Dict[UUID, Dict[str, Any]]:
+    return {p.id: p.model_dump(mode="json") for p in snapshot.products}
+
+
+def _reserialize_products(
+    rows: Dict[UUID, Dict[str, Any]],
+    snapshot: CatalogSnapshot,
+    changed_ids: Set[UUID],
+) -> Dict[UUID, Dict[str, Any]]:
+    for product_id in changed_ids:
+        product = snapshot.get(product_id)
+        if product is None:
+            rows.pop(product_id, None)
+        else:
+            rows[product_id] = product.model_dump(mode="json")
+    return rows
+
+
+def get_serialized_products(snapshot: CatalogSnapshot) -> Dict[UUID, Dict[str, Any]]:
+    """JSON-ready product dicts, serialized once per catalog change (used for projections)"""
+    return snapshot.derived("serialized", _serialize_products, _reserialize_products)
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_reload_lock = asyncio.Lock()
+
+
+async def get_catalog_version(db: AsyncSession, name: str = PRODUCTS_CATALOG) -> int:
+    """Get the current version of a catalog (0 if it was never bumped)"""
+    result = await db.execute(
+        select(CatalogVersion.version).where(CatalogVersion.name == name)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def get_catalog_versions(db: AsyncSession, *names: str) -> Dict[str, int]:
+    """Get the current versions of several catalogs in one query"""
+    result = await db.execute(
+        select(CatalogVersion.name, CatalogVersion.version).where(CatalogVersion.name.in_(names))
+    )
+    versions = dict(result.all())
+    return {name: versions.get(name) or 0 for name in names}
+
+
+async def bump_catalog_version(db: AsyncSession, name: str = PRODUCTS_CATALOG) -> None:
+    """
+    Increment the catalog version.
+    Must run in the same transaction as the write, before commit, so every
+    worker reloads its snapshot once the change becomes visible.
+    """
+    now = datetime.utcnow().isoformat()
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+    if dialect is not None:
+        # Upsert, so two workers creating the first version don't race on the primary key
+        stmt = dialect.insert(CatalogVersion).values(name=name, version=1, updated_at=now)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[CatalogVersion.name],
+            set_={"version": CatalogVersion.version + 1, "updated_at": now},
+        ))
+        return
+
+    result = await db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.name == name)
+        .values(version=CatalogVersion.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.add(CatalogVersion(name=name, version=1, updated_at=now))
+
+
+async def get_current_catalog(db: AsyncSession) -> Optional[CatalogSnapshot]:
+    """Get this worker's snapshot only if it is up to date, without reloading it"""
+    version = await get_catalog_version(db)
+    if _snapshot is not None and _snapshot.version == version:
+        return _snapshot
+    return None
+
+
+async def get_catalog(db: AsyncSession) -> CatalogSnapshot:
+    """
+    Get the product catalog snapshot for this worker.
+    Costs a single-row version lookup; the full catalog is reloaded only
+    when the version changed since the last load.
+    """
+    global _snapshot
+
+    version = await get_catalog_version(db)
+    if _snapshot is not None and _snapshot.version == version:
+        return _snapshot
+
+    async with _reload_lock:
+        # Another request may have reloaded while we were waiting
+        if _snapshot is None or _snapshot.version != version:
+            result = await db.execute(
+                select(Product, ProductAttributes)
+                .outerjoin(ProductAttributes, ProductAttributes.product_id == Product.id)
+                .order_by(Product.id)
+            )
+            products = []
+            attributes = {}
+            for product, product_attributes in result.all():
+                products.append(ProductResponse.model_validate(product))
+                if product_attributes is not None:
+                    attributes[product.id] = ProductAttributesResponse.model_validate(product_attributes)
+                else:
+                    # Written outside the API (seed scripts) and not backfilled yet
+                    attributes[product.id] = ProductAttributesResponse(
+                        **extract_attributes(product.type, product.specifications)
+                    )
+            _snapshot = CatalogSnapshot(version, products, attributes, previous=_snapshot)
+            _snapshot.carry_over()
+
+    return _snapshot
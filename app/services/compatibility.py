@@ -0,0 +1,352 @@
+import bisect
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models.product import ProductType
+from app.services.catalog import CatalogSnapshot
+from app.services.rules import PAIR_RULES, POWER_RULE, PairRule, CompiledPairRule
+
+# Components whose draw counts towards the PSU requirement
+POWER_SLOTS = POWER_RULE.draw_slots
+
+# Cleared positions per live position of a type above which an update rebuilds the matrix
+MAX_HOLE_RATIO = 0.25
+
+
+def _value_key(value: Any) -> Any:
+    # Lists (cooler sockets) are grouped by their contents
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _value(key: Any) -> Any:
+    return list(key) if isinstance(key, tuple) else key
+
+
+# Stands for "not in the matrix yet", as None is a valid attribute value
+_MISSING = object()
+
+
+class Positions:
+    """
+    Bit positions of the products of one type. A product keeps its position
+    while it stays in the catalog; positions of removed products are never
+    reused, so masks stay valid across incremental updates, and the holes
+    they leave are compacted by the next full build.
+    """
+
+    def __init__(self):
+        self.index: Dict[UUID, int] = {}
+        self.ids: List[Optional[UUID]] = []
+
+    def add(self, product_id: UUID) -> None:
+        if product_id not in self.index:
+            self.index[product_id] = len(self.ids)
+            self.ids.append(product_id)
+
+    def remove(self, product_id: UUID) -> None:
+        position = self.index.pop(product_id, None)
+        if position is not None:
+            self.ids[position] = None
+
+    def bit(self, product_id: UUID) -> int:
+        return 1 << self.index[product_id]
+
+    @property
+    def holes(self) -> int:
+        return len(self.ids) - len(self.index)
+
+    def decode(self, mask: int) -> Set[UUID]:
+        ids = set()
+        while mask:
+            low = mask & -mask
+            ids.add(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+
+class PairMatrix:
+    """
+    Materialized result of one pair rule for every (left, right) product pair.
+    rows[left id] has a bit per compatible right product, cols[right id] a
+    bit per compatible left product. Products are grouped by attribute value,
+    so the rule is evaluated once per distinct value pair.
+    """
+
+    def __init__(self, rule: PairRule, left: Positions, right: Positions):
+        self.compiled = CompiledPairRule(rule)
+        self.left = left
+        self.right = right
+        self.rows: Dict[UUID, int] = {}
+        self.cols: Dict[UUID, int] = {}
+        self.left_values: Dict[UUID, Any] = {}
+        self.right_values: Dict[UUID, Any] = {}
+        self.left_groups: Dict[Any, int] = defaultdict(int)
+        self.right_groups: Dict[Any, int] = defaultdict(int)
+
+    @property
+    def rule(self) -> PairRule:
+        return self.compiled.rule
+
+    def _passes(self, left_key: Any, right_key: Any) -> bool:
+        return self.compiled.passes(_value(left_key), _value(right_key))
+
+    def _row(self, left_key: Any) -> int:
+        row = 0
+        for right_key, mask in self.right_groups.items():
+            if self._passes(left_key, right_key):
+                row |= mask
+        return row
+
+    def _col(self, right_key: Any) -> int:
+        col = 0
+        for left_key, mask in self.left_groups.items():
+            if self._passes(left_key, right_key):
+                col |= mask
+        return col
+
+    def _group(self, values: Dict[UUID, Any], groups: Dict[Any, int], bit: int, product_id: UUID, value: Any) -> Any:
+        key = _value_key(value)
+        values[product_id] = key
+        groups[key] |= bit
+        return key
+
+    def _ungroup(self, values: Dict[UUID, Any], groups: Dict[Any, int], bit: int, product_id: UUID) -> None:
+        key = values.pop(product_id)
+        groups[key] &= ~bit
+        if not groups[key]:
+            del groups[key]
+
+    def build(self, snapshot: CatalogSnapshot) -> None:
+        rule = self.rule
+        for product in snapshot.by_type.get(rule.left_slot, []):
+            value = getattr(snapshot.attributes_of(product.id), rule.left_field)
+            self._group(self.left_values, self.left_groups, self.left.bit(product.id), product.id, value)
+        for product in snapshot.by_type.get(rule.right_slot, []):
+            value = getattr(snapshot.attributes_of(product.id), rule.right_field)
+            self._group(self.right_values, self.right_groups, self.right.bit(product.id), product.id, value)
+
+        rows = {key: self._row(key) for key in self.left_groups}
+        cols = {key: self._col(key) for key in self.right_groups}
+        self.rows = {product_id: rows[key] for product_id, key in self.left_values.items()}
+        self.cols = {product_id: cols[key] for product_id, key in self.right_values.items()}
+
+    def remove_left(self, product_id: UUID) -> None:
+        if product_id not in self.left_values:
+            return
+        bit = self.left.bit(product_id)
+        self._ungroup(self.left_values, self.left_groups, bit, product_id)
+        del self.rows[product_id]
+        for right_id in self.cols:
+            self.cols[right_id] &= ~bit
+
+    def remove_right(self, product_id: UUID) -> None:
+        if product_id not in self.right_values:
+            return
+        bit = self.right.bit(product_id)
+        self._ungroup(self.right_values, self.right_groups, bit, product_id)
+        del self.cols[product_id]
+        for left_id in self.rows:
+            self.rows[left_id] &= ~bit
+
+    def set_left(self, product_id: UUID, value: Any) -> None:
+        """(Re)compute the row of a left product unless its attribute value is unchanged"""
+        if self.left_values.get(product_id, _MISSING) == _value_key(value):
+            return
+        self.remove_left(product_id)
+        self.add_left(product_id, value)
+
+    def set_right(self, product_id: UUID, value: Any) -> None:
+        """(Re)compute the column of a right product unless its attribute value is unchanged"""
+        if self.right_values.get(product_id, _MISSING) == _value_key(value):
+            return
+        self.remove_right(product_id)
+        self.add_right(product_id, value)
+
+    def add_left(self, product_id: UUID, value: Any) -> None:
+        """Compute the row of a new left product and set its bit in the columns it passes"""
+        bit = self.left.bit(product_id)
+        key = self._group(self.left_values, self.left_groups, bit, product_id, value)
+        self.rows[product_id] = self._row(key)
+        for right_id in self.right.decode(self.rows[product_id]):
+            self.cols[right_id] |= bit
+
+    def add_right(self, product_id: UUID, value: Any) -> None:
+        """Compute the column of a new right product and set its bit in the rows it passes"""
+        bit = self.right.bit(product_id)
+        key = self._group(self.right_values, self.right_groups, bit, product_id, value)
+        self.cols[product_id] = self._col(key)
+        for left_id in self.left.decode(self.cols[product_id]):
+            self.rows[left_id] |= bit
+
+    def compatible(self, left_id: UUID, right_id: UUID) -> Optional[bool]:
+        """Whether the pair passes the rule, or None if either product is unknown"""
+        row = self.rows.get(left_id)
+        if row is None or right_id not in self.right_values:
+            return None
+        return bool(row & self.right.bit(right_id))
+
+
+class CompatibilityMatrix:
+    """
+    Pairwise compatibility of the whole catalog for every pair rule
+    (CPU x motherboard, RAM x motherboard, cooler x CPU, GPU x case,
+    cooler x case). Built once, then patched for changed products only.
+    """
+
+    def __init__(self):
+        self.positions: Dict[ProductType, Positions] = defaultdict(Positions)
+        self.matrices: Dict[str, PairMatrix] = {}
+
+    def compatible(self, rule: PairRule, left_id: UUID, right_id: UUID) -> Optional[bool]:
+        return self.matrices[rule.name].compatible(left_id, right_id)
+
+    def allowed(self, target: ProductType, selected: Dict[ProductType, UUID]) -> Iterable[int]:
+        """Masks of `target` products allowed by each blocking rule with a selected counterpart"""
+        for pair in self.matrices.values():
+            rule = pair.rule
+            if rule.severity != "error":
+                continue
+            if rule.left_slot == target and rule.right_slot in selected:
+                yield pair.cols.get(selected[rule.right_slot], 0)
+            elif rule.right_slot == target and rule.left_slot in selected:
+                yield pair.rows.get(selected[rule.left_slot], 0)
+
+
+def build_compatibility_matrix(snapshot: CatalogSnapshot) -> CompatibilityMatrix:
+    matrix = CompatibilityMatrix()
+    for product in snapshot.products:
+        matrix.positions[product.type].add(product.id)
+    for rule in PAIR_RULES:
+        pair = PairMatrix(rule, matrix.positions[rule.left_slot], matrix.positions[rule.right_slot])
+        pair.build(snapshot)
+        matrix.matrices[rule.name] = pair
+    return matrix
+
+
+def update_compatibility_matrix(
+    matrix: CompatibilityMatrix,
+    snapshot: CatalogSnapshot,
+    changed_ids: Set[UUID],
+) -> CompatibilityMatrix:
+    for product_id in changed_ids:
+        product = snapshot.get(product_id)
+        # Removed products, and products that changed type, leave their old position
+        for product_type, positions in matrix.positions.items():
+            if product_id in positions.index and (product is None or product.type != product_type):
+                for pair in matrix.matrices.values():
+                    pair.remove_left(product_id)
+                    pair.remove_right(product_id)
+                positions.remove(product_id)
+        if product is None:
+            continue
+
+        # Others keep theirs, and only rules whose attribute changed are re-evaluated
+        matrix.positions[product.type].add(product_id)
+        attributes = snapshot.attributes_of(product_id)
+        for pair in matrix.matrices.values():
+            if pair.rule.left_slot == product.type:
+                pair.set_left(product_id, getattr(attributes, pair.rule.left_field))
+            if pair.rule.right_slot == product.type:
+                pair.set_right(product_id, getattr(attributes, pair.rule.right_field))
+
+    if any(positions.holes > MAX_HOLE_RATIO * len(positions.index) for positions in matrix.positions.values()):
+        return build_compatibility_matrix(snapshot)
+    return matrix
+
+
+def get_compatibility_matrix(snapshot: CatalogSnapshot) -> CompatibilityMatrix:
+    return snapshot.derived("compatibility_matrix", build_compatibility_matrix, update_compatibility_matrix)
+
+
+class PowerIndex:
+    """Products of one type sorted by a power attribute; products without it always fit"""
+
+    def __init__(self, snapshot: CatalogSnapshot, product_type: ProductType, field: str):
+        self.unknown: Set[UUID] = set()
+        numeric: List[Tuple[float, UUID]] = []
+        for product in snapshot.by_type.get(product_type, []):
+            value = getattr(snapshot.attributes_of(product.id), field)
+            if value is None:
+                self.unknown.add(product.id)
+            else:
+                numeric.append((float(value), product.id))
+        numeric.sort(key=lambda item: item[0])
+        self.sorted_values = [value for value, _ in numeric]
+        self.sorted_ids = [product_id for _, product_id in numeric]
+
+    def at_most(self, value: float) -> Set[UUID]:
+        end = bisect.bisect_right(self.sorted_values, value)
+        return set(self.sorted_ids[:end]) | self.unknown
+
+    def at_least(self, value: float) -> Set[UUID]:
+        start = bisect.bisect_left(self.sorted_values, value)
+        return set(self.sorted_ids[start:]) | self.unknown
+
+
+class CompatibilityIndex:
+    """Compatible-part lookups: the pair matrix plus sorted power indexes for the PSU check"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.matrix = get_compatibility_matrix(snapshot)
+        self.power: Dict[ProductType, PowerIndex] = {
+            slot: PowerIndex(snapshot, slot, POWER_RULE.draw_field) for slot in POWER_SLOTS
+        }
+        self.power[POWER_RULE.supply_slot] = PowerIndex(snapshot, POWER_RULE.supply_slot, POWER_RULE.supply_field)
+
+    def compatible_ids(
+        self,
+        target: ProductType,
+        selected: Dict[ProductType, UUID],
+    ) -> Optional[Set[UUID]]:
+        """
+        Ids of `target` products compatible with the selected components,
+        or None if no constraint applies.
+        """
+        mask: Optional[int] = None
+        for allowed in self.matrix.allowed(target, selected):
+            mask = allowed if mask is None else mask & allowed
+        allowed_ids = self.matrix.positions[target].decode(mask) if mask is not None else None
+
+        # PSU must cover the draw of the selected CPU and GPU
+        attributes = {slot: self.snapshot.attributes_of(product_id) for slot, product_id in selected.items()}
+        draws = {
+            slot: getattr(attributes[slot], POWER_RULE.draw_field)
+            for slot in POWER_SLOTS
+            if slot in attributes and getattr(attributes[slot], POWER_RULE.draw_field)
+        }
+        supply_slot = POWER_RULE.supply_slot
+        supply = getattr(attributes[supply_slot], POWER_RULE.supply_field) if supply_slot in attributes else None
+
+        power_ids = None
+        if target == supply_slot and draws:
+            power_ids = self.power[target].at_least(sum(draws.values()))
+        elif target in POWER_SLOTS and supply:
+            power_ids = self.power[target].at_most(
+                supply - sum(draw for slot, draw in draws.items() if slot != target)
+            )
+
+        if power_ids is None:
+            return allowed_ids
+        return power_ids if allowed_ids is None else allowed_ids & power_ids
+
+
+def get_compatibility_index(snapshot: CatalogSnapshot) -> CompatibilityIndex:
+    return snapshot.derived("compatibility", CompatibilityIndex)
+
+
+def resolve_selection(
+    snapshot: CatalogSnapshot,
+    components: Dict[str, str],
+) -> Dict[ProductType, UUID]:
+    """Map a partial component_map to the ids of the selected products"""
+    selected = {}
+    for slot, product_id in components.items():
+        if not product_id:
+            continue
+        product = snapshot.get(UUID(str(product_id)))
+        if product is None:
+            raise KeyError(product_id)
+        selected[ProductType(slot)] = product.id
+    return selected
@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.models.product import ProductType
+from app.models.preset import PresetSegment
+from app.schemas.configurator import ConfiguratorMessage, ConfiguratorState
+from app.schemas.validation import ValidationResponse
+from app.services.catalog import CatalogSnapshot
+from app.services.scoring import score_products
+from app.services.validation import SLOTS, psu_candidates_for, revalidate, validate_components
+
+
+class ConfiguratorSession:
+    """
+    Build state of one live configurator connection.
+    Slot changes are revalidated incrementally against the previous result,
+    so only the rules reading the changed slot run.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, str] = {}
+        self.segment = PresetSegment.GAMING
+        self.validation: Optional[ValidationResponse] = None
+        self.catalog_version: Optional[int] = None
+
+    def apply(self, catalog: CatalogSnapshot, message: ConfiguratorMessage) -> ConfiguratorState:
+        """Apply a client message and return the new state; raises ValueError for invalid ones"""
+        if message.action == "set":
+            if message.slot not in SLOTS:
+                raise ValueError(f"Unknown slot: {message.slot}")
+            previous = self.validation if self.components else None
+            if message.product_id:
+                self.components[message.slot] = str(UUID(message.product_id))
+            else:
+                self.components.pop(message.slot, None)
+            self.validation = revalidate(
+                catalog, self.components, ProductType(message.slot), previous, self.catalog_version
+            )
+        elif message.action == "load":
+            self.components = {slot: str(UUID(pid)) for slot, pid in (message.components or {}).items() if pid}
+            self.validation = validate_components(catalog, self.components)
+        elif message.action == "segment":
+            if message.segment is None:
+                raise ValueError("Missing segment")
+            self.segment = message.segment
+        
+        # Catalog changed since the last message (or refresh): revalidate everything
+        if self.validation is None or self.catalog_version != catalog.version:
+            self.validation = validate_components(catalog, self.components)
+        self.catalog_version = catalog.version
+        
+        return self.state(catalog)
+
+    def state(self, catalog: CatalogSnapshot) -> ConfiguratorState:
+        products = [catalog.get(UUID(pid)) for pid in self.components.values()]
+        products = [product for product in products if product is not None]
+        
+        return ConfiguratorState(
+            components=self.components,
+            segment=self.segment,
+            is_valid=self.validation.is_valid,
+            issues=self.validation.issues,
+            total_power_consumption=self.validation.total_power_consumption,
+            recommended_psu_wattage=self.validation.recommended_psu_wattage,
+            psu_candidates=psu_candidates_for(catalog, self.validation),
+            total_price=round(sum(product.price for product in products), 2),
+            performance_score=score_products(
+                products,
+                self.segment,
+                attributes_of=lambda product: catalog.attributes_of(product.id).model_dump(exclude_none=True),
+            ) if products else None,
+        )
@@ -0,0 +1,174 @@
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models.product import ProductType
+from app.schemas.product import ProductResponse, ProductAttributesResponse
+from app.services.catalog import CatalogSnapshot
+
+FACETS = ("brand", "socket", "vram_gb", "ram_type", "form_factor", "price_band")
+
+# Facets listed in their natural order rather than by count
+ORDERED_FACETS = ("vram_gb", "price_band")
+
+# (upper bound, label) in PLN, last band is open-ended
+PRICE_BANDS: List[Tuple[float, str]] = [
+    (500, "0-500"),
+    (1000, "500-1000"),
+    (2000, "1000-2000"),
+    (4000, "2000-4000"),
+    (8000, "4000-8000"),
+    (float("inf"), "8000+"),
+]
+
+# Brands whose name is more than the first word of the product name
+MULTIWORD_BRANDS = ("be quiet!", "Silver Monkey", "Fractal Design", "Cooler Master")
+
+# Distinct filter selections whose counts are kept
+COUNTS_CACHE_SIZE = 256
+
+
+def price_band(price: float) -> str:
+    for upper, label in PRICE_BANDS:
+        if price < upper:
+            return label
+    return PRICE_BANDS[-1][1]
+
+
+def product_brand(product: ProductResponse) -> Optional[str]:
+    if product.brand:
+        return product.brand
+    for brand in MULTIWORD_BRANDS:
+        if product.name.lower().startswith(brand.lower()):
+            return brand
+    return product.name.split()[0] if product.name else None
+
+
+def facet_values(product: ProductResponse, attributes: ProductAttributesResponse) -> Dict[str, str]:
+    """Facet values of one product (facets it has no value for are left out)"""
+    values = {
+        "brand": product_brand(product),
+        "socket": attributes.socket,
+        "vram_gb": attributes.vram_gb,
+        "ram_type": attributes.ram_type,
+        "form_factor": attributes.form_factor,
+        "price_band": price_band(product.price),
+    }
+    return {facet: str(value) for facet, value in values.items() if value is not None}
+
+
+class FacetIndex:
+    """
+    Inverted index facet -> value -> product ids, maintained incrementally
+    as products change. Counts for a filter selection are cached until the
+    next change.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Set[UUID]]] = {facet: defaultdict(set) for facet in FACETS}
+        self.values: Dict[UUID, Dict[str, str]] = {}
+        self.by_type: Dict[ProductType, Set[UUID]] = defaultdict(set)
+        self.in_stock: Set[UUID] = set()
+        self.types: Dict[UUID, ProductType] = {}
+        self._counts: "OrderedDict[tuple, Tuple[int, Dict[str, Counter]]]" = OrderedDict()
+
+    def add(self, product: ProductResponse, attributes: ProductAttributesResponse) -> None:
+        values = facet_values(product, attributes)
+        self.values[product.id] = values
+        self.types[product.id] = product.type
+        self.by_type[product.type].add(product.id)
+        if product.in_stock:
+            self.in_stock.add(product.id)
+        for facet, value in values.items():
+            self.postings[facet][value].add(product.id)
+        self._counts.clear()
+
+    def remove(self, product_id: UUID) -> None:
+        values = self.values.pop(product_id, None)
+        if values is None:
+            return
+        self.by_type[self.types.pop(product_id)].discard(product_id)
+        self.in_stock.discard(product_id)
+        for facet, value in values.items():
+            ids = self.postings[facet][value]
+            ids.discard(product_id)
+            if not ids:
+                del self.postings[facet][value]
+        self._counts.clear()
+
+    def counts(
+        self,
+        type: Optional[ProductType] = None,
+        in_stock: Optional[bool] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> Tuple[int, Dict[str, Counter]]:
+        """
+        Count facet values for a selection.
+        Values within a facet are OR-ed, facets are AND-ed, and each facet is
+        counted ignoring its own selection so the sidebar shows what each
+        other choice would yield.
+        """
+        filters = {facet: values for facet, values in (filters or {}).items() if values}
+        key = (type, in_stock, tuple(sorted((f, tuple(sorted(v))) for f, v in filters.items())))
+        if key in self._counts:
+            self._counts.move_to_end(key)
+            return self._counts[key]
+
+        base = set(self.by_type.get(type, set())) if type else set(self.values)
+        if in_stock is True:
+            base &= self.in_stock
+        elif in_stock is False:
+            base -= self.in_stock
+
+        matching = {
+            facet: set().union(*(self.postings[facet].get(v, set()) for v in values))
+            for facet, values in filters.items()
+        }
+
+        total_ids = base
+        for ids in matching.values():
+            total_ids = total_ids & ids
+
+        counts: Dict[str, Counter] = {}
+        for facet in FACETS:
+            candidates = base
+            for other, ids in matching.items():
+                if other != facet:
+                    candidates = candidates & ids
+            counts[facet] = Counter(
+                self.values[pid][facet] for pid in candidates if facet in self.values[pid]
+            )
+
+        self._counts[key] = (len(total_ids), counts)
+        if len(self._counts) > COUNTS_CACHE_SIZE:
+            self._counts.popitem(last=False)
+        return self._counts[key]
+
+
+def build_facet_index(snapshot: CatalogSnapshot) -> FacetIndex:
+    index = FacetIndex()
+    for product in snapshot.products:
+        index.add(product, snapshot.attributes_of(product.id))
+    return index
+
+
+def update_facet_index(index: FacetIndex, snapshot: CatalogSnapshot, changed_ids: Set[UUID]) -> FacetIndex:
+    for product_id in changed_ids:
+        index.remove(product_id)
+        product = snapshot.get(product_id)
+        if product is not None:
+            index.add(product, snapshot.attributes_of(product_id))
+    return index
+
+
+def get_facet_index(snapshot: CatalogSnapshot) -> FacetIndex:
+    return snapshot.derived("facets", build_facet_index, update_facet_index)
+
+
+def sort_facet_values(facet: str, counts: Counter) -> List[Tuple[str, int]]:
+    if facet == "price_band":
+        order = [label for _, label in PRICE_BANDS]
+        return sorted(counts.items(), key=lambda item: order.index(item[0]))
+    if facet in ORDERED_FACETS:
+        return sorted(counts.items(), key=lambda item: float(item[0]))
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,64 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.models.product import ProductType
+from app.schemas.product import ProductResponse, ProductAttributesResponse
+from app.services.catalog import CatalogSnapshot
+from app.services.scoring import component_score
+
+
+class FrontierPoint(NamedTuple):
+    product: ProductResponse
+    score: float
+
+
+def _performance(product: ProductResponse, attributes: ProductAttributesResponse) -> Optional[float]:
+    if product.performance_score is not None:
+        return product.performance_score
+    # No default score: unlisted CPUs and GPUs would all tie on the placeholder
+    return component_score(product.type, product.name, attributes.model_dump(exclude_none=True), default=None)
+
+
+# Score each frontier can be computed on; products without it are left out
+SCORES: Dict[str, Callable[[ProductResponse, ProductAttributesResponse], Optional[float]]] = {
+    "performance": _performance,
+    "gaming": lambda product, attributes: product.gaming_score,
+    "productivity": lambda product, attributes: product.productivity_score,
+    "benchmark": lambda product, attributes: attributes.benchmark_points,
+}
+
+
+def pareto_frontier(points: List[FrontierPoint]) -> List[FrontierPoint]:
+    """
+    Points no other point beats on both price and score. Sorted by price
+    (best score first within a price), a point is on the frontier iff it
+    scores higher than everything cheaper.
+    """
+    points = sorted(points, key=lambda p: (p.product.price, -p.score))
+    frontier: List[FrontierPoint] = []
+    for point in points:
+        if not frontier or point.score > frontier[-1].score:
+            frontier.append(point)
+    return frontier
+
+
+class FrontierIndex:
+    """Price/score Pareto frontiers of the in-stock products, per type and score, for one catalog version"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.frontiers: Dict[Tuple[ProductType, str], List[FrontierPoint]] = {}
+        for product_type in snapshot.by_type:
+            products = snapshot.select(product_type, in_stock=True)
+            for name, score_of in SCORES.items():
+                points = []
+                for product in products:
+                    score = score_of(product, snapshot.attributes_of(product.id))
+                    if score is not None:
+                        points.append(FrontierPoint(product, float(score)))
+                self.frontiers[(product_type, name)] = pareto_frontier(points)
+
+    def frontier(self, product_type: ProductType, score: str) -> List[FrontierPoint]:
+        return self.frontiers.get((product_type, score), [])
+
+
+def get_frontier_index(snapshot: CatalogSnapshot) -> FrontierIndex:
+    return snapshot.derived("frontier", FrontierIndex)
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.models.product import Product
+from app.models.price_history import PriceHistory
+from app.schemas.product import PricePoint
+
+EPOCH = date(1970, 1, 1)
+
+# Points returned by resolution=auto before switching to a coarser bucket
+MAX_POINTS = 370
+
+RESOLUTIONS = ("day", "week", "month")
+
+
+def to_day(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def from_day(day: int) -> date:
+    return EPOCH + timedelta(days=day)
+
+
+def to_grosze(price: float) -> int:
+    return int(round(price * 100))
+
+
+def bucket_start(day: int, resolution: str) -> date:
+    value = from_day(day)
+    if resolution == "week":
+        return value - timedelta(days=value.weekday())
+    if resolution == "month":
+        return value.replace(day=1)
+    return value
+
+
+def choose_resolution(start: date, end: date) -> str:
+    """Finest resolution keeping the range within MAX_POINTS buckets"""
+    days = (end - start).days + 1
+    if days <= MAX_POINTS:
+        return "day"
+    if days // 7 <= MAX_POINTS:
+        return "week"
+    return "month"
+
+
+async def record_price(db: AsyncSession, product: Product, previous: Optional[float] = None) -> None:
+    """
+    Append the product's current price to its history.
+    Call in the same transaction as the write, after flush; pass the old
+    price on updates so unchanged prices are not recorded.
+    """
+    if previous is not None and to_grosze(previous) == to_grosze(product.price):
+        return
+    db.add(PriceHistory(
+        product_id=product.id,
+        day=to_day(datetime.utcnow().date()),
+        price=to_grosze(product.price),
+    ))
+
+
+async def delete_price_history(db: AsyncSession, product_id: UUID) -> None:
+    """Delete the price history of a product (before deleting the product)"""
+    await db.execute(delete(PriceHistory).where(PriceHistory.product_id == product_id))
+
+
+async def ensure_price_history(db: AsyncSession) -> None:
+    """Start the history of products written without one (e.g. by seed scripts)"""
+    result = await db.execute(
+        select(Product)
+        .outerjoin(PriceHistory, PriceHistory.product_id == Product.id)
+        .where(PriceHistory.id.is_(None))
+    )
+    for product in result.scalars().all():
+        created = datetime.fromisoformat(product.created_at).date() if product.created_at else datetime.utcnow().date()
+        db.add(PriceHistory(product_id=product.id, day=to_day(created), price=to_grosze(product.price)))
+
+    await db.commit()
+
+
+async def get_price_history(
+    db: AsyncSession,
+    product_id: UUID,
+    start: Optional[date],
+    end: date,
+    resolution: str,
+) -> Tuple[str, List[PricePoint]]:
+    """
+    Price history between start and end (inclusive), downsampled to one point
+    per bucket. The price in effect on `start` opens the range, so a product
+    whose price did not change inside it still gets a point.
+    """
+    query = (
+        select(PriceHistory.day, PriceHistory.price)
+        .where(PriceHistory.product_id == product_id, PriceHistory.day <= to_day(end))
+        .order_by(PriceHistory.day, PriceHistory.id)
+    )
+    if start is not None:
+        query = query.where(PriceHistory.day >= to_day(start))
+    changes = [(row.day, row.price) for row in await db.execute(query)]
+
+    if start is not None and (not changes or changes[0][0] > to_day(start)):
+        opening = await db.execute(
+            select(PriceHistory.price)
+            .where(PriceHistory.product_id == product_id, PriceHistory.day < to_day(start))
+            .order_by(PriceHistory.day.desc(), PriceHistory.id.desc())
+            .limit(1)
+        )
+        price = opening.scalar_one_or_none()
+        if price is not None:
+            changes.insert(0, (to_day(start), price))
+
+    if not changes:
+        return (resolution if resolution != "auto" else "day"), []
+
+    if resolution == "auto":
+        resolution = choose_resolution(start or from_day(changes[0][0]), end)
+
+    # Changes are in day order, so buckets fill one after another
+    points: List[PricePoint] = []
+    for day, price in changes:
+        bucket = bucket_start(day, resolution)
+        value = price / 100
+        if points and points[-1].date == bucket:
+            point = points[-1]
+            point.price = value
+            point.min_price = min(point.min_price, value)
+            point.max_price = max(point.max_price, value)
+        else:
+            points.append(PricePoint(date=bucket, price=value, min_price=value, max_price=value))
+
+    return resolution, points
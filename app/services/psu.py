@@ -0,0 +1,49 @@
+import bisect
+from typing import Dict, List, Tuple
+
+from app.models.product import ProductType
+from app.schemas.product import ProductResponse, PsuCandidate
+from app.services.catalog import CatalogSnapshot
+
+# Candidates embedded in validation responses
+EMBEDDED_CANDIDATES = 5
+
+
+class PsuIndex:
+    """In-stock PSUs with a known wattage, sorted by wattage for bisection"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        rows: List[Tuple[int, ProductResponse]] = []
+        for product in snapshot.select(ProductType.PSU, in_stock=True):
+            wattage = snapshot.attributes_of(product.id).wattage_w
+            if wattage:
+                rows.append((wattage, product))
+        rows.sort(key=lambda row: (row[0], row[1].price))
+        self.wattages = [wattage for wattage, _ in rows]
+        self.products = [product for _, product in rows]
+        self._by_price: Dict[int, List[PsuCandidate]] = {}
+
+    def candidates(self, required_w: float, limit: int) -> List[PsuCandidate]:
+        """PSUs of at least `required_w`, cheapest first (then lowest wattage)"""
+        start = bisect.bisect_left(self.wattages, required_w)
+        # Few distinct wattages exist, so each suffix is sorted by price once per snapshot
+        if start not in self._by_price:
+            self._by_price[start] = sorted(
+                (
+                    PsuCandidate(
+                        id=product.id,
+                        name=product.name,
+                        price=product.price,
+                        currency=product.currency,
+                        wattage_w=wattage,
+                        image_url=product.image_url,
+                    )
+                    for wattage, product in zip(self.wattages[start:], self.products[start:])
+                ),
+                key=lambda candidate: (candidate.price, candidate.wattage_w),
+            )
+        return self._by_price[start][:limit]
+
+
+def get_psu_index(snapshot: CatalogSnapshot) -> PsuIndex:
+    return snapshot.derived("psu", PsuIndex)
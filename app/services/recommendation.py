@@ -1,47 +1,286 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import bisect
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.models.preset import Preset, DeviceType, PresetSegment
-from app.models.product import Product, ProductType, ProductSegment
+from app.models.product import ProductType
+from app.models.recommendation_bucket import RecommendationBucket
+from app.schemas.preset import PresetResponse
+from app.services.alternatives import Alternative, get_alternatives_index
+from app.services.catalog import (
+    CatalogSnapshot,
+    get_catalog_version,
+    get_catalog_versions,
+    PRESETS_CATALOG,
+    PRODUCTS_CATALOG,
+)
+
+# Presets stored per budget bucket (the most the recommendations route returns)
+STORED_RECOMMENDATIONS = 10
+
+# Budget key of the result without a budget
+NO_BUDGET = -1
+
+
+class BudgetWindows:
+    """
+    Presets of one (device_type, segment) as a step function of the budget.
+    The distinct min/max budgets split the budget axis into points and open
+    gaps; each step holds its matching presets already in recommendation
+    order, so a lookup is one bisection plus a slice.
+    """
+
+    def __init__(self, presets: List[PresetResponse]):
+        self.ordered = sorted(presets, key=_recommendation_order)
+        self.bounds = sorted({
+            bound for p in presets for bound in (p.min_budget, p.max_budget) if bound is not None
+        })
+        # Step 2i is the gap below bounds[i] (2k: above the last), step 2i + 1 the point bounds[i]
+        self.steps: List[List[PresetResponse]] = []
+        for step in range(2 * len(self.bounds) + 1):
+            budget = self._representative(step)
+            self.steps.append([p for p in self.ordered if _covers(p, budget)])
+
+    def _representative(self, step: int) -> float:
+        index, is_point = divmod(step, 2)
+        if is_point:
+            return self.bounds[index]
+        if not self.bounds:
+            return 0.0
+        if index == 0:
+            return self.bounds[0] - 1
+        if index == len(self.bounds):
+            return self.bounds[-1] + 1
+        return (self.bounds[index - 1] + self.bounds[index]) / 2
+
+    def lookup(self, budget: Optional[float], limit: int) -> List[PresetResponse]:
+        if budget is None:
+            return self.ordered[:limit]
+        index = bisect.bisect_left(self.bounds, budget)
+        is_point = index < len(self.bounds) and self.bounds[index] == budget
+        return self.steps[2 * index + is_point][:limit]
+
+
+def _recommendation_order(preset: PresetResponse) -> tuple:
+    # Priority (higher first), then performance score with missing scores last
+    score = preset.performance_score if preset.performance_score is not None else float("-inf")
+    return (-(preset.priority or 0), -score, preset.id)
+
+
+def _covers(preset: PresetResponse, budget: float) -> bool:
+    return (
+        (preset.min_budget is None or preset.min_budget <= budget)
+        and (preset.max_budget is None or preset.max_budget >= budget)
+    )
+
+
+class PresetIndex:
+    """Active presets grouped by (device_type, segment), at a presets catalog version"""
+
+    def __init__(self, version: int, presets: List[PresetResponse]):
+        self.version = version
+        self.by_id: Dict[UUID, PresetResponse] = {preset.id: preset for preset in presets}
+        groups: Dict[Tuple[DeviceType, PresetSegment], List[PresetResponse]] = defaultdict(list)
+        for preset in presets:
+            if preset.is_active:
+                groups[(preset.device_type, preset.segment)].append(preset)
+        self.windows = {key: BudgetWindows(group) for key, group in groups.items()}
+
+    def recommend(
+        self,
+        device_type: DeviceType,
+        segment: PresetSegment,
+        budget: Optional[float],
+        limit: int,
+    ) -> List[PresetResponse]:
+        windows = self.windows.get((device_type, segment))
+        return windows.lookup(budget, limit) if windows else []
+
+
+_preset_index: Optional[PresetIndex] = None
+_preset_lock = asyncio.Lock()
+
+
+async def get_preset_index(db: AsyncSession, version: Optional[int] = None) -> PresetIndex:
+    """
+    Get this worker's preset index, rebuilt when the presets catalog
+    version changed since it was loaded. Pass `version` if already read.
+    """
+    global _preset_index
+
+    if version is None:
+        version = await get_catalog_version(db, PRESETS_CATALOG)
+    if _preset_index is not None and _preset_index.version == version:
+        return _preset_index
+
+    async with _preset_lock:
+        if _preset_index is None or _preset_index.version != version:
+            result = await db.execute(select(Preset))
+            presets = [PresetResponse.model_validate(p) for p in result.scalars().all()]
+            _preset_index = PresetIndex(version, presets)
+
+    return _preset_index
+
+
+def _source(presets_version: int, products_version: int) -> str:
+    return f"{presets_version}:{products_version}"
+
+
+def _join_ids(presets: List[PresetResponse]) -> str:
+    return ",".join(str(preset.id) for preset in presets)
+
+
+class RecommendationTable:
+    """This worker's copy of the recommendation table, as sorted budget keys per (device_type, segment)"""
+
+    def __init__(self, source: str, rows: List[RecommendationBucket]):
+        self.source = source
+        self.budgets: Dict[Tuple[DeviceType, PresetSegment], List[int]] = defaultdict(list)
+        self.preset_ids: Dict[Tuple[DeviceType, PresetSegment], List[List[UUID]]] = defaultdict(list)
+        for row in sorted(rows, key=lambda row: row.budget):
+            key = (row.device_type, row.segment)
+            self.budgets[key].append(row.budget)
+            self.preset_ids[key].append([UUID(preset_id) for preset_id in row.preset_ids.split(",") if preset_id])
+
+    def lookup(self, device_type: DeviceType, segment: PresetSegment, budget: Optional[float]) -> List[UUID]:
+        key = (device_type, segment)
+        position = bisect.bisect_right(self.budgets.get(key, []), NO_BUDGET if budget is None else budget) - 1
+        return self.preset_ids[key][position] if position >= 0 else []
+
+
+_table: Optional[RecommendationTable] = None
+
+
+async def refresh_recommendation_table(db: AsyncSession) -> bool:
+    """
+    Recompute the recommendation table if it was computed at older presets
+    or products catalog versions. Every (device_type, segment), with presets
+    or not, gets the result without a budget and one row per budget step
+    where the result changes, up to one step past the highest preset budget
+    bound. Returns whether the table was rewritten.
+    """
+    versions = await get_catalog_versions(db, PRESETS_CATALOG, PRODUCTS_CATALOG)
+    index = await get_preset_index(db, versions[PRESETS_CATALOG])
+    source = _source(versions[PRESETS_CATALOG], versions[PRODUCTS_CATALOG])
+    result = await db.execute(select(RecommendationBucket.source).distinct())
+    if result.scalars().all() == [source]:
+        return False
+    
+    step = settings.recommendation_budget_step
+    rows = []
+    for device_type in DeviceType:
+        for segment in PresetSegment:
+            windows = index.windows.get((device_type, segment)) or BudgetWindows([])
+            key = {"device_type": device_type, "segment": segment, "source": source}
+            rows.append({
+                **key, "budget": NO_BUDGET, "preset_ids": _join_ids(windows.lookup(None, STORED_RECOMMENDATIONS))
+            })
+            top = int(windows.bounds[-1]) if windows.bounds else 0
+            previous = None
+            for budget in range(0, (top // step + 2) * step, step):
+                preset_ids = _join_ids(windows.lookup(budget, STORED_RECOMMENDATIONS))
+                if preset_ids != previous:
+                    rows.append({**key, "budget": budget, "preset_ids": preset_ids})
+                    previous = preset_ids
+    
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+    try:
+        if dialect is not None:
+            # Upsert, then drop the rows this source no longer has, so concurrent refreshes don't collide
+            stmt = dialect.insert(RecommendationBucket).values(rows)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[RecommendationBucket.device_type, RecommendationBucket.segment, RecommendationBucket.budget],
+                set_={"preset_ids": stmt.excluded.preset_ids, "source": stmt.excluded.source},
+            ))
+            await db.execute(delete(RecommendationBucket).where(RecommendationBucket.source != source))
+        else:
+            await db.execute(delete(RecommendationBucket))
+            db.add_all([RecommendationBucket(**row) for row in rows])
+        await db.commit()
+    except IntegrityError:
+        # Another worker rewrote the table first
+        await db.rollback()
+        return False
+    return True
+
+
+async def load_recommendation_table(db: AsyncSession) -> None:
+    """Load the recommendation table into this worker, unless it is mid-rewrite (rows of several sources)"""
+    global _table
+
+    result = await db.execute(select(RecommendationBucket))
+    rows = result.scalars().all()
+    sources = {row.source for row in rows}
+    if len(sources) == 1:
+        _table = RecommendationTable(sources.pop(), rows)
+
+
+async def _run_refresh() -> None:
+    global _refresh_pending
+    while _refresh_pending:
+        _refresh_pending = False
+        try:
+            async with AsyncSessionLocal() as db:
+                await refresh_recommendation_table(db)
+                await load_recommendation_table(db)
+        except Exception as e:
+            print(f"⚠ Recommendation refresh error: {e}")
+
+
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_pending = False
+
+
+def schedule_recommendation_refresh() -> None:
+    """
+    Run the refresh job in the background. Called after commits that bump
+    the preset or product catalog; a call while the job is running makes it
+    run once more, so a refresh that started before the write is not final.
+    """
+    global _refresh_task, _refresh_pending
+    _refresh_pending = True
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_run_refresh())
 
 
 async def get_recommendations(
     device_type: DeviceType,
     segment: PresetSegment,
-    budget: float,
+    budget: Optional[float],
     db: AsyncSession,
     limit: int = 3,
-) -> List[Preset]:
+) -> List[PresetResponse]:
     """
     Rule-based recommendation engine.
     Returns top presets matching criteria, ordered by priority and performance.
+    Budgets on the step grid are a keyed lookup in this worker's copy of
+    the precomputed table; other budgets, or a table not refreshed since
+    the last catalog change, are answered from the in-memory index.
+    Writes schedule the refresh themselves; a stale table seen here (e.g.
+    after a write on another worker) schedules one as a fallback.
     """
-    query = select(Preset).where(
-        and_(
-            Preset.device_type == device_type,
-            Preset.segment == segment,
-            Preset.is_active == True,
-            (Preset.min_budget.is_(None) | (Preset.min_budget <= budget)),
-            (Preset.max_budget.is_(None) | (Preset.max_budget >= budget)),
-        )
-    )
+    versions = await get_catalog_versions(db, PRESETS_CATALOG, PRODUCTS_CATALOG)
+    index = await get_preset_index(db, versions[PRESETS_CATALOG])
     
-    # Order by priority (higher first), then performance score
-    query = query.order_by(
-        Preset.priority.desc(),
-        Preset.performance_score.desc(),
-    )
+    step = settings.recommendation_budget_step
+    if budget is None or budget % step == 0:
+        table = _table
+        if table is not None and table.source == _source(versions[PRESETS_CATALOG], versions[PRODUCTS_CATALOG]):
+            return [index.by_id[preset_id] for preset_id in table.lookup(device_type, segment, budget)[:limit]]
+        schedule_recommendation_refresh()
     
-    query = query.limit(limit)
-    
-    result = await db.execute(query)
-    presets = result.scalars().all()
-    
-    return presets
+    return index.recommend(device_type, segment, budget, limit)
 
 
 def generate_recommendation_reasoning(
-    preset: Preset,
+    preset: PresetResponse,
     device_type: DeviceType,
     segment: PresetSegment,
     budget: float,
@@ -72,48 +311,21 @@ def generate_recommendation_reasoning(
     return ". ".join(reasons) if reasons else "Rekomendowany zestaw"
 
 
-async def get_alternative_components(
-    component_type: ProductType,
-    current_product_id: str,
-    segment: Optional[ProductSegment],
-    db: AsyncSession,
+def get_alternative_components(
+    catalog: CatalogSnapshot,
+    current_product_id: UUID,
+    selected: Dict[ProductType, UUID],
+    segment: Optional[PresetSegment] = None,
+    budget: Optional[float] = None,
     limit: int = 5,
-) -> List[Product]:
+) -> List[Alternative]:
     """
-    Get alternative products for a component type, filtered by compatibility.
-    Used in "Replace component" feature.
+    Get alternative products for a component, compatible with the rest of
+    the build and within the build budget. Used in "Replace component" feature.
     """
-    # Get current product to understand compatibility requirements
-    result = await db.execute(
-        select(Product).where(Product.id == current_product_id)
-    )
-    current_product = result.scalar_one_or_none()
-    
-    if not current_product:
+    if catalog.get(current_product_id) is None:
         return []
     
-    # Build query for alternatives
-    query = select(Product).where(
-        and_(
-            Product.type == component_type,
-            Product.id != current_product_id,
-            Product.in_stock == True,
-        )
-    )
-    
-    if segment:
-        query = query.where(Product.segment == segment)
-    
-    # Order by performance score or price
-    query = query.order_by(
-        Product.performance_score.desc().nulls_last(),
-        Product.price.asc(),
+    return get_alternatives_index(catalog).alternatives(
+        current_product_id, selected, segment=segment, budget=budget, limit=limit
     )
-    
-    query = query.limit(limit)
-    
-    result = await db.execute(query)
-    products = result.scalars().all()
-    
-    return products
-
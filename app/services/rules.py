@@ -0,0 +1,253 @@
+import operator
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.models.product import ProductType
+from app.schemas.product import ProductAttributesResponse
+from app.schemas.validation import ValidationIssue, RuleTrace
+
+
+class PairRule(NamedTuple):
+    """
+    Compatibility check between the attributes of two selected components:
+    `left_slot.left_field <op> right_slot.right_field` must hold.
+    Skipped when either component or either attribute is missing.
+    """
+    name: str
+    left_slot: ProductType
+    left_field: str
+    op: str  # eq, le, member (left value in right list)
+    right_slot: ProductType
+    right_field: str
+    component_type: str  # slot the issue is reported on
+    issue_type: str
+    severity: str  # error, warning
+    message: str  # formatted with {left} and {right}
+    details: Tuple[str, ...] = ()  # issue details keys for (left, right)
+
+
+class PowerRule(NamedTuple):
+    """Selected PSU must supply the summed draw of `draw_slots`, with headroom"""
+    name: str
+    supply_slot: ProductType
+    supply_field: str
+    draw_slots: Tuple[ProductType, ...]
+    draw_field: str
+    headroom: float
+
+
+# The checks of validate_configuration, as data. Adding a check means adding a line here.
+PAIR_RULES: List[PairRule] = [
+    PairRule(
+        "cpu_motherboard_socket",
+        ProductType.CPU, "socket", "eq", ProductType.MOTHERBOARD, "socket",
+        "cpu", "socket_mismatch", "error",
+        "CPU socket ({left}) does not match motherboard socket ({right})",
+        ("cpu_socket", "mb_socket"),
+    ),
+    PairRule(
+        "ram_motherboard_type",
+        ProductType.RAM, "ram_type", "eq", ProductType.MOTHERBOARD, "ram_type",
+        "ram", "ram_type_mismatch", "error",
+        "RAM type ({left}) does not match motherboard RAM type ({right})",
+        ("ram_type", "mb_ram_type"),
+    ),
+    PairRule(
+        "ram_motherboard_speed",
+        ProductType.RAM, "speed_mhz", "le", ProductType.MOTHERBOARD, "max_ram_speed_mhz",
+        "ram", "ram_speed_warning", "warning",
+        "RAM speed ({left} MHz) exceeds motherboard max ({right} MHz)",
+    ),
+    PairRule(
+        "gpu_case_clearance",
+        ProductType.GPU, "length_mm", "le", ProductType.CASE, "max_gpu_length_mm",
+        "gpu", "form_factor", "error",
+        "GPU length ({left} mm) exceeds case max ({right} mm)",
+    ),
+    PairRule(
+        "cooler_cpu_socket",
+        ProductType.CPU, "socket", "member", ProductType.COOLER, "supported_sockets",
+        "cooler", "socket_mismatch", "error",
+        "Cooler does not support CPU socket ({left})",
+    ),
+    PairRule(
+        "cooler_case_clearance",
+        ProductType.COOLER, "height_mm", "le", ProductType.CASE, "max_cooler_height_mm",
+        "cooler", "form_factor", "error",
+        "Cooler height ({left} mm) exceeds case max ({right} mm)",
+    ),
+]
+
+POWER_RULE = PowerRule(
+    "psu_power",
+    ProductType.PSU, "wattage_w",
+    (ProductType.CPU, ProductType.GPU), "tdp_w",
+    headroom=1.2,  # 20% headroom
+)
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "le": operator.le,
+    "member": lambda value, values: value in values,
+}
+
+
+def _missing(value: Any) -> bool:
+    return value is None or value == "" or value == []
+
+
+class CompiledPairRule:
+    """A PairRule bound to its operator, evaluated against two attribute sets"""
+
+    __slots__ = ("rule", "check")
+
+    def __init__(self, rule: PairRule):
+        self.rule = rule
+        self.check = OPERATORS[rule.op]
+
+    @property
+    def slots(self) -> Tuple[ProductType, ProductType]:
+        return (self.rule.left_slot, self.rule.right_slot)
+
+    def passes(self, left_value: Any, right_value: Any) -> bool:
+        return _missing(left_value) or _missing(right_value) or self.check(left_value, right_value)
+
+    def evaluate(
+        self,
+        left: ProductAttributesResponse,
+        right: ProductAttributesResponse,
+    ) -> Optional[ValidationIssue]:
+        rule = self.rule
+        left_value = getattr(left, rule.left_field)
+        right_value = getattr(right, rule.right_field)
+        if self.passes(left_value, right_value):
+            return None
+        return ValidationIssue(
+            component_type=rule.component_type,
+            issue_type=rule.issue_type,
+            severity=rule.severity,
+            message=rule.message.format(left=left_value, right=right_value),
+            details=dict(zip(rule.details, (left_value, right_value))) if rule.details else None,
+            rule=rule.name,
+        )
+
+
+class RulesResult(NamedTuple):
+    issues: List[ValidationIssue]
+    total_power: Optional[float]  # None when the power rule was not run
+    recommended_psu: Optional[float]
+    trace: List[RuleTrace]
+
+
+class RuleEngine:
+    """
+    Rules compiled into evaluators grouped by slot pair.
+    Only the pairs whose both slots are selected are looked at, so a call
+    costs the number of applicable rules.
+    """
+
+    def __init__(self, pair_rules: List[PairRule], power_rule: PowerRule):
+        self.pairs: Dict[Tuple[ProductType, ProductType], List[CompiledPairRule]] = defaultdict(list)
+        for rule in pair_rules:
+            compiled = CompiledPairRule(rule)
+            self.pairs[compiled.slots].append(compiled)
+        self.power_rule = power_rule
+        self.power_slots = (power_rule.supply_slot,) + power_rule.draw_slots
+
+    def rules_for(self, slot: ProductType) -> List[str]:
+        """Names of the rules that read the given slot"""
+        names = [c.rule.name for slots, rules in self.pairs.items() if slot in slots for c in rules]
+        if slot in self.power_slots:
+            names.append(self.power_rule.name)
+        return names
+
+    def run(
+        self,
+        selected: Dict[ProductType, ProductAttributesResponse],
+        lookup: Optional[Callable[[PairRule], Optional[bool]]] = None,
+        slot: Optional[ProductType] = None,
+    ) -> RulesResult:
+        """
+        Evaluate the applicable rules, or with `slot` only those reading it.
+        `lookup` may answer a pair rule from precomputed results (None if it
+        can't); the rule is only evaluated when the lookup misses or reports
+        a failure that needs its issue.
+        """
+        issues: List[ValidationIssue] = []
+        trace: List[RuleTrace] = []
+
+        for (left_slot, right_slot), rules in self.pairs.items():
+            if slot is not None and slot not in (left_slot, right_slot):
+                continue
+            left = selected.get(left_slot)
+            right = selected.get(right_slot)
+            if left is None or right is None:
+                continue
+            for compiled in rules:
+                started = time.perf_counter()
+                passed = lookup(compiled.rule) if lookup is not None else None
+                issue = None if passed else compiled.evaluate(left, right)
+                trace.append(_trace(compiled.rule.name, compiled.slots, issue is None, started))
+                if issue is not None:
+                    issues.append(issue)
+
+        if slot is not None and slot not in self.power_slots:
+            return RulesResult(issues, None, None, trace)
+
+        started = time.perf_counter()
+        total_power, recommended_psu, power_issue = self._check_power(selected)
+        if total_power > 0 or self.power_rule.supply_slot in selected:
+            trace.append(_trace(self.power_rule.name, self.power_slots, power_issue is None, started))
+        if power_issue is not None:
+            issues.append(power_issue)
+
+        return RulesResult(issues, total_power, recommended_psu, trace)
+
+    def _check_power(
+        self,
+        selected: Dict[ProductType, ProductAttributesResponse],
+    ) -> Tuple[float, float, Optional[ValidationIssue]]:
+        rule = self.power_rule
+        total_power = float(sum(
+            getattr(selected[slot], rule.draw_field) or 0 for slot in rule.draw_slots if slot in selected
+        ))
+
+        supply = selected.get(rule.supply_slot)
+        if supply is None:
+            return total_power, 0.0, None
+
+        psu_wattage = float(getattr(supply, rule.supply_field) or 0)
+        recommended_psu = total_power * rule.headroom
+
+        if psu_wattage < total_power:
+            return total_power, recommended_psu, ValidationIssue(
+                component_type="psu",
+                issue_type="insufficient_power",
+                severity="error",
+                message=f"PSU wattage ({psu_wattage}W) is insufficient. Required: ~{total_power:.0f}W",
+                details={"psu_wattage": psu_wattage, "required": total_power},
+                rule=rule.name,
+            )
+        if psu_wattage < recommended_psu:
+            return total_power, recommended_psu, ValidationIssue(
+                component_type="psu",
+                issue_type="low_power_margin",
+                severity="warning",
+                message=f"PSU wattage ({psu_wattage}W) is close to recommended ({recommended_psu:.0f}W)",
+                rule=rule.name,
+            )
+        return total_power, recommended_psu, None
+
+
+def _trace(name: str, slots: Tuple[ProductType, ...], passed: bool, started: float) -> RuleTrace:
+    return RuleTrace(
+        rule=name,
+        slots=[slot.value for slot in slots],
+        passed=passed,
+        duration_ms=round((time.perf_counter() - started) * 1000, 4),
+    )
+
+
+# Compiled once, at import
+rule_engine = RuleEngine(PAIR_RULES, POWER_RULE)
@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterable, Optional
+
+from app.models.product import ProductType
+from app.models.preset import PresetSegment
+from app.services.specs import extract_attributes
+
+# Relative performance (0-100) of the CPUs and GPUs offered in presets, by product name
+CPU_SCORES: Dict[str, float] = {
+    "AMD Ryzen 5 3600": 40,
+    "AMD Ryzen 5 5600GT": 45,
+    "AMD Ryzen 5 8400F": 50,
+    "AMD Ryzen 5 8500G": 52,
+    "AMD Ryzen 5 7500F": 60,
+    "AMD Ryzen 5 7600": 62,
+    "AMD Ryzen 5 7600X": 65,
+    "AMD Ryzen 5 7500X3D": 68,
+    "AMD Ryzen 5 9600X": 70,
+    "AMD Ryzen 7 8700F": 72,
+    "Intel Core i5-14600KF": 75,
+    "AMD Ryzen 7 7700X": 78,
+    "AMD Ryzen 7 7800X3D": 90,
+    "AMD Ryzen 7 9700X": 85,
+    "AMD Ryzen 9 7900X": 88,
+    "AMD Ryzen 7 9800X3D": 95,
+    "AMD Ryzen 9 9900X": 92,
+    "AMD Ryzen 9 9900X3D": 96,
+    "AMD Ryzen 9 9950X": 98,
+    "AMD Ryzen 9 9950X3D": 100,
+}
+
+GPU_SCORES: Dict[str, float] = {
+    "ASRock Radeon RX 9060 XT Challenger OC 8GB": 45,
+    "ASRock Radeon RX 9060 XT Challenger OC 16GB": 50,
+    "KFA2 GeForce RTX 5060 Ti 1-Click OC 16GB": 55,
+    "Zotac GeForce RTX 5070 Twin Edge 12GB": 70,
+    "Sapphire Radeon RX 9070 Pulse 16GB": 75,
+    "Gigabyte Radeon RX 9070 XT Gaming OC 16GB": 80,
+    "ASRock Radeon RX 9070 XT Steel Legend Dark 16GB": 80,
+    "INNO3D GeForce RTX 5070 Ti X3 16GB": 85,
+    "ASUS GeForce RTX 5070 Ti Prime OC 16GB": 85,
+    "Zotac GeForce RTX 5080 Solid Core OC 16GB": 92,
+    "Gigabyte GeForce RTX 5090 AORUS Master 32GB": 100,
+}
+
+# Score of a CPU or GPU missing from the tables above
+DEFAULT_SCORE = 50
+
+# Share of each component in a build's score, per segment
+SEGMENT_WEIGHTS: Dict[PresetSegment, Dict[ProductType, float]] = {
+    PresetSegment.GAMING: {ProductType.CPU: 0.25, ProductType.GPU: 0.50, ProductType.RAM: 0.15, ProductType.STORAGE: 0.10},
+    PresetSegment.PRO: {ProductType.CPU: 0.40, ProductType.GPU: 0.30, ProductType.RAM: 0.20, ProductType.STORAGE: 0.10},
+    PresetSegment.BUSINESS: {ProductType.CPU: 0.50, ProductType.GPU: 0.10, ProductType.RAM: 0.25, ProductType.STORAGE: 0.15},
+    PresetSegment.HOME: {ProductType.CPU: 0.30, ProductType.GPU: 0.35, ProductType.RAM: 0.20, ProductType.STORAGE: 0.15},
+}
+
+
+def ram_score(attributes: Dict[str, Any]) -> float:
+    capacity = attributes.get("capacity_gb") or 16
+    speed = attributes.get("speed_mhz") or 3200
+    ram_type = attributes.get("ram_type") or "DDR4"
+    
+    # Base score from capacity
+    if capacity >= 64:
+        score = 100
+    elif capacity >= 32:
+        score = 75
+    else:
+        score = 50
+    
+    # Adjust for speed and type
+    if ram_type == "DDR5":
+        if speed >= 6400:
+            score = min(100, score + 10)
+        elif speed >= 6000:
+            score = min(100, score + 5)
+    
+    return score
+
+
+def storage_score(attributes: Dict[str, Any]) -> float:
+    capacity = attributes.get("capacity_gb") or 1000
+    pcie_gen = attributes.get("pcie_gen") or 4
+    
+    # Base score from capacity, adjusted for interface
+    score = 100 if capacity >= 2000 else 70
+    if pcie_gen >= 5:
+        score = min(100, score + 15)
+    
+    return score
+
+
+def component_score(
+    product_type: ProductType,
+    name: str,
+    attributes: Dict[str, Any],
+    default: Optional[float] = DEFAULT_SCORE,
+) -> Optional[float]:
+    """
+    Score (0-100) of one component, or None for types that don't count
+    towards the build score. CPUs and GPUs missing from the score tables
+    get `default`; pass None to tell them apart from listed parts.
+    """
+    if product_type == ProductType.CPU:
+        return CPU_SCORES.get(name, default)
+    if product_type == ProductType.GPU:
+        return GPU_SCORES.get(name, default)
+    if product_type == ProductType.RAM:
+        return ram_score(attributes)
+    if product_type == ProductType.STORAGE:
+        return storage_score(attributes)
+    return None
+
+
+def segment_weights(segment: Optional[PresetSegment]) -> Dict[ProductType, float]:
+    return SEGMENT_WEIGHTS.get(segment, SEGMENT_WEIGHTS[PresetSegment.GAMING])
+
+
+def build_score(scores: Dict[ProductType, float], segment: Optional[PresetSegment]) -> float:
+    """Weighted score of a build from its component scores (missing components count as 0)"""
+    weights = segment_weights(segment)
+    return round(sum(scores.get(product_type, 0) * weight for product_type, weight in weights.items()), 2)
+
+
+def score_products(products: Iterable[Any], segment: Optional[PresetSegment], attributes_of=None) -> float:
+    """
+    Score a build from its products (anything with type, name and
+    specifications). `attributes_of(product)` may supply already parsed
+    attributes; otherwise they are parsed from the specifications.
+    """
+    scores: Dict[ProductType, float] = {}
+    for product in products:
+        attributes = attributes_of(product) if attributes_of else extract_attributes(product.type, product.specifications)
+        score = component_score(product.type, product.name, attributes)
+        if score is not None:
+            scores[product.type] = score
+    return build_score(scores, segment)
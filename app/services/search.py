@@ -0,0 +1,174 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+
+from app.core.database import engine
+from app.models.product import Product, ProductType
+
+# SQLite: FTS5 shadow table keyed by product id (hex, like the products table)
+# Postgres: tsvector column on products with a GIN index
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        product_id UNINDEXED, name, brand, model, description, specs,
+        tokenize = 'unicode61', prefix = '2 3'
+    )
+    """,
+]
+POSTGRES_SCHEMA = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+]
+
+# Column weights: name ranks above brand/model, above spec values, above description
+SQLITE_RANK = "bm25(products_fts, 0.0, 10.0, 5.0, 5.0, 1.0, 2.0)"
+
+
+def _is_postgres() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase and strip Polish diacritics so 'dlugosc' finds 'Długość'"""
+    value = str(value).lower().replace("ł", "l")
+    value = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in value if not unicodedata.combining(ch))
+
+
+def _document(product: Product) -> Dict[str, str]:
+    """Searchable text fields of a product"""
+    specs = product.specifications or {}
+    return {
+        "name": normalize_text(product.name or ""),
+        "brand": normalize_text(product.brand or ""),
+        "model": normalize_text(product.model or ""),
+        "description": normalize_text(product.description or ""),
+        "specs": normalize_text(" ".join(str(v) for v in specs.values())),
+    }
+
+
+def _tokens(query: str) -> List[str]:
+    return re.findall(r"\w+", normalize_text(query))
+
+
+async def ensure_search_index(db: AsyncSession) -> None:
+    """Create the search index if missing and backfill products not yet indexed"""
+    for statement in (POSTGRES_SCHEMA if _is_postgres() else SQLITE_SCHEMA):
+        await db.execute(text(statement))
+
+    if _is_postgres():
+        result = await db.execute(select(Product).where(text("search_vector IS NULL")))
+    else:
+        result = await db.execute(
+            select(Product).where(
+                text("products.id NOT IN (SELECT product_id FROM products_fts)")
+            )
+        )
+
+    for product in result.scalars().all():
+        await index_product(db, product)
+
+    await db.commit()
+
+
+async def index_product(db: AsyncSession, product: Product) -> None:
+    """
+    (Re)index a product. Call in the same transaction as the write;
+    the product must already be flushed so its id is set.
+    """
+    doc = _document(product)
+
+    if _is_postgres():
+        await db.execute(
+            text(
+                """
+                UPDATE products SET search_vector =
+                    setweight(to_tsvector('simple', :name), 'A') ||
+                    setweight(to_tsvector('simple', :brand || ' ' || :model), 'B') ||
+                    setweight(to_tsvector('simple', :specs), 'C') ||
+                    setweight(to_tsvector('simple', :description), 'D')
+                WHERE id = :id
+                """
+            ),
+            {"id": product.id, **doc},
+        )
+        return
+
+    await remove_product_from_index(db, product.id)
+    await db.execute(
+        text(
+            """
+            INSERT INTO products_fts (product_id, name, brand, model, description, specs)
+            VALUES (:product_id, :name, :brand, :model, :description, :specs)
+            """
+        ),
+        {"product_id": product.id.hex, **doc},
+    )
+
+
+async def remove_product_from_index(db: AsyncSession, product_id: UUID) -> None:
+    """Drop a product from the search index (Postgres rows go with the product)"""
+    if _is_postgres():
+        return
+    await db.execute(
+        text("DELETE FROM products_fts WHERE product_id = :product_id"),
+        {"product_id": product_id.hex},
+    )
+
+
+async def search_product_ids(
+    db: AsyncSession,
+    query: str,
+    limit: int = 20,
+    product_type: Optional[ProductType] = None,
+) -> List[Tuple[UUID, float]]:
+    """
+    Full-text search over name, brand, model, description and spec values.
+    Every query term is prefix-matched (type-ahead) and all terms must match.
+    `product_type` filters inside the query, so `limit` applies to matches
+    of that type. Returns (product_id, rank) pairs, best match first.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    # Enum columns store member names
+    params: Dict[str, Any] = {"limit": limit}
+    type_filter = ""
+    if product_type is not None:
+        type_filter = "AND products.type = :type"
+        params["type"] = product_type.name
+
+    if _is_postgres():
+        result = await db.execute(
+            text(
+                f"""
+                SELECT id, ts_rank(search_vector, q) AS rank
+                FROM products, to_tsquery('simple', :q) AS q
+                WHERE search_vector @@ q {type_filter}
+                ORDER BY rank DESC
+                LIMIT :limit
+                """
+            ),
+            {"q": " & ".join(f"{t}:*" for t in tokens), **params},
+        )
+        return [(UUID(str(row.id)), float(row.rank)) for row in result]
+
+    result = await db.execute(
+        text(
+            f"""
+            SELECT product_id, {SQLITE_RANK} AS rank
+            FROM products_fts
+            JOIN products ON products.id = products_fts.product_id
+            WHERE products_fts MATCH :q {type_filter}
+            ORDER BY rank
+            LIMIT :limit
+            """
+        ),
+        {"q": " ".join(f'"{t}"*' for t in tokens), **params},
+    )
+    # bm25() is lower-is-better; flip it so callers always sort descending
+    return [(UUID(row.product_id), -float(row.rank)) for row in result]
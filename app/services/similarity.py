@@ -0,0 +1,170 @@
+from typing import Dict, List, NamedTuple, Optional, Set
+from uuid import UUID
+
+import numpy as np
+
+from app.models.product import ProductType
+from app.schemas.product import ProductResponse, ProductAttributesResponse
+from app.services.catalog import CatalogSnapshot
+from app.services.scoring import component_score
+
+# Parsed specs that make up a product's vector, per type (price and scores are always included)
+SPEC_FIELDS: Dict[ProductType, List[str]] = {
+    ProductType.CPU: ["cores", "threads", "base_clock_mhz", "boost_clock_mhz", "benchmark_points", "tdp_w"],
+    ProductType.GPU: ["vram_gb", "boost_clock_mhz", "benchmark_points", "length_mm", "tdp_w"],
+    ProductType.RAM: ["capacity_gb", "speed_mhz"],
+    ProductType.STORAGE: ["capacity_gb", "pcie_gen", "read_speed_mbps"],
+    ProductType.PSU: ["wattage_w"],
+    ProductType.MOTHERBOARD: ["ram_slots", "max_ram_speed_mhz"],
+    ProductType.COOLER: ["tdp_w", "radiator_mm", "height_mm"],
+    ProductType.CASE: ["max_gpu_length_mm", "max_cooler_height_mm"],
+}
+
+SCORE_FIELDS = ["performance_score", "gaming_score", "productivity_score"]
+
+
+class Neighbour(NamedTuple):
+    product_id: UUID
+    distance: float
+
+
+def _vector(product: ProductResponse, attributes: ProductAttributesResponse) -> List[float]:
+    """Raw features of a product, NaN where unknown"""
+    # Log price, so 100 PLN apart means more for cheap parts than for expensive ones
+    values = [np.log1p(product.price), component_score(product.type, product.name, attributes.model_dump(exclude_none=True))]
+    values += [getattr(product, field) for field in SCORE_FIELDS]
+    values += [getattr(attributes, field) for field in SPEC_FIELDS.get(product.type, [])]
+    return [np.nan if value is None else float(value) for value in values]
+
+
+class TypeVectors:
+    """
+    Feature matrix of the products of one type, one row per product.
+    Columns are standardized at query time with the current per-column
+    spread, so rows can be replaced without touching the others.
+    """
+
+    def __init__(self, width: int):
+        self.ids: List[UUID] = []
+        self.rows: Dict[UUID, int] = {}
+        self.matrix = np.empty((0, width), dtype=np.float64)
+        self.price = np.empty(0, dtype=np.float64)
+        self.in_stock = np.empty(0, dtype=bool)
+        self.scale = np.ones(width, dtype=np.float64)
+
+    def remove(self, product_ids: Set[UUID]) -> None:
+        keep = [row for row, product_id in enumerate(self.ids) if product_id not in product_ids]
+        if len(keep) == len(self.ids):
+            return
+        self.ids = [self.ids[row] for row in keep]
+        self.matrix = self.matrix[keep]
+        self.price = self.price[keep]
+        self.in_stock = self.in_stock[keep]
+        self.rows = {product_id: row for row, product_id in enumerate(self.ids)}
+
+    def add(self, snapshot: CatalogSnapshot, products: List[ProductResponse]) -> None:
+        if not products:
+            return
+        vectors = [_vector(product, snapshot.attributes_of(product.id)) for product in products]
+        for product in products:
+            self.rows[product.id] = len(self.ids)
+            self.ids.append(product.id)
+        self.matrix = np.vstack([self.matrix, np.array(vectors, dtype=np.float64)])
+        self.price = np.concatenate([self.price, [product.price for product in products]])
+        self.in_stock = np.concatenate([self.in_stock, [product.in_stock for product in products]])
+
+    def rescale(self) -> None:
+        known = ~np.isnan(self.matrix)
+        scale = np.ones(self.matrix.shape[1], dtype=np.float64)
+        for column in range(self.matrix.shape[1]):
+            values = self.matrix[known[:, column], column]
+            if values.size > 1 and values.std() > 0:
+                scale[column] = values.std()
+        self.scale = scale
+
+    def nearest(
+        self,
+        product_id: UUID,
+        k: int,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+    ) -> List[Neighbour]:
+        """
+        k nearest products by Euclidean distance over the standardized
+        features. A feature known for only one of the two products counts as
+        one standard deviation apart; one unknown for both doesn't count.
+        """
+        row = self.rows[product_id]
+        diff = (self.matrix - self.matrix[row]) / self.scale
+        missing = np.isnan(diff)
+        one_sided = np.isnan(self.matrix) != np.isnan(self.matrix[row])
+        diff[missing] = 0.0
+        diff[one_sided] = 1.0
+        distance = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        mask[row] = False
+        if max_price is not None:
+            mask &= self.price <= max_price
+        if in_stock is not None:
+            mask &= self.in_stock == in_stock
+        candidates = np.flatnonzero(mask)
+        if k < candidates.size:
+            candidates = candidates[np.argpartition(distance[candidates], k)[:k]]
+        candidates = candidates[np.lexsort((self.price[candidates], distance[candidates]))]
+        return [Neighbour(self.ids[index], round(float(distance[index]), 4)) for index in candidates]
+
+
+class SimilarityIndex:
+    """Feature matrices of the whole catalog, patched for changed products on catalog reloads"""
+
+    def __init__(self):
+        self.types: Dict[ProductType, TypeVectors] = {}
+
+    def _vectors(self, product_type: ProductType) -> TypeVectors:
+        if product_type not in self.types:
+            width = 2 + len(SCORE_FIELDS) + len(SPEC_FIELDS.get(product_type, []))
+            self.types[product_type] = TypeVectors(width)
+        return self.types[product_type]
+
+    def nearest(self, product: ProductResponse, k: int, **filters) -> List[Neighbour]:
+        return self._vectors(product.type).nearest(product.id, k, **filters)
+
+
+def build_similarity_index(snapshot: CatalogSnapshot) -> SimilarityIndex:
+    index = SimilarityIndex()
+    for product_type, products in snapshot.by_type.items():
+        vectors = index._vectors(product_type)
+        vectors.add(snapshot, products)
+        vectors.rescale()
+    return index
+
+
+def update_similarity_index(
+    index: SimilarityIndex,
+    snapshot: CatalogSnapshot,
+    changed_ids: Set[UUID],
+) -> SimilarityIndex:
+    # A product may have changed type, so it is dropped from every matrix
+    touched: Set[ProductType] = set()
+    for product_type, vectors in index.types.items():
+        if any(product_id in vectors.rows for product_id in changed_ids):
+            vectors.remove(changed_ids)
+            touched.add(product_type)
+
+    added: Dict[ProductType, List[ProductResponse]] = {}
+    for product_id in changed_ids:
+        product = snapshot.get(product_id)
+        if product is not None:
+            added.setdefault(product.type, []).append(product)
+    for product_type, products in added.items():
+        index._vectors(product_type).add(snapshot, products)
+        touched.add(product_type)
+
+    for product_type in touched:
+        index.types[product_type].rescale()
+    return index
+
+
+def get_similarity_index(snapshot: CatalogSnapshot) -> SimilarityIndex:
+    return snapshot.derived("similarity", build_similarity_index, update_similarity_index)
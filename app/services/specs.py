@@ -0,0 +1,224 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.models.product import Product, ProductType
+from app.models.product_attributes import ProductAttributes
+
+# Attribute -> specification keys it is read from, per product type (first present key wins).
+# The catalog mixes English keys (imports) and Polish display keys (TechLipton seed).
+SPEC_KEYS: Dict[ProductType, Dict[str, Tuple[str, ...]]] = {
+    ProductType.CPU: {
+        "socket": ("socket", "Gniazdo"),
+        "cores": ("cores", "Rdzenie"),
+        "threads": ("threads", "Wątki"),
+        "base_clock_mhz": ("base_clock", "Taktowanie bazowe"),
+        "boost_clock_mhz": ("boost_clock", "Taktowanie boost"),
+        "benchmark_points": ("benchmark", "Benchmark"),
+        "tdp_w": ("tdp", "TDP"),
+    },
+    ProductType.GPU: {
+        "vram_gb": ("vram", "VRAM"),
+        "length_mm": ("length", "Długość"),
+        "boost_clock_mhz": ("boost_clock", "Taktowanie boost"),
+        "benchmark_points": ("benchmark", "Benchmark"),
+        "tdp_w": ("power_consumption", "tdp", "TDP", "Pobór mocy"),
+    },
+    ProductType.MOTHERBOARD: {
+        "socket": ("socket", "Gniazdo"),
+        "ram_type": ("ram_type", "Sloty RAM"),
+        "ram_slots": ("ram_slots", "Sloty RAM"),
+        "max_ram_speed_mhz": ("ram_max_speed",),
+        "form_factor": ("form_factor", "Format"),
+    },
+    ProductType.RAM: {
+        "ram_type": ("type", "Typ"),
+        "capacity_gb": ("capacity", "Pojemność"),
+        "speed_mhz": ("speed", "frequency", "Taktowanie"),
+    },
+    ProductType.STORAGE: {
+        "capacity_gb": ("capacity", "Pojemność"),
+        "pcie_gen": ("interface", "Interfejs"),
+        "read_speed_mbps": ("read_speed", "Odczyt"),
+    },
+    ProductType.PSU: {
+        "wattage_w": ("wattage", "power", "Moc"),
+    },
+    ProductType.CASE: {
+        "form_factor": ("form_factor", "motherboard_compatibility"),
+        "max_gpu_length_mm": ("max_gpu_length",),
+        "max_cooler_height_mm": ("max_cooler_height",),
+    },
+    ProductType.COOLER: {
+        "supported_sockets": ("socket", "sockets"),
+        "tdp_w": ("max_tdp", "tdp", "TDP"),
+        "height_mm": ("height", "Wysokość"),
+        "radiator_mm": ("radiator_size", "Rozmiar"),
+    },
+}
+
+# Board formats from largest to smallest; a case supports everything it lists
+FORM_FACTORS = ["E-ATX", "ATX", "mATX", "Mini-ITX"]
+
+ATTRIBUTE_FIELDS: List[str] = [
+    column.name for column in ProductAttributes.__table__.columns if column.name != "product_id"
+]
+
+# Digits with optional space-grouped thousands ('24 002'), so separate numbers ('DDR5 6000') don't merge
+_NUMBER = re.compile(r"(?:\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?!\d)|\d+)(?:[.,]\d+)?")
+
+# A number followed by its clock unit ('DDR5 6000 MHz'), and a module count times capacity ('2 x 16 GB')
+_CLOCK = re.compile(rf"({_NUMBER.pattern})\s*(?:[gm]hz|mt/s)", re.IGNORECASE)
+_KIT = re.compile(rf"(\d+)\s*[x×]\s*({_NUMBER.pattern})", re.IGNORECASE)
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """First number in a display string: '24 002 pkt' -> 24002, '2.5 GHz' -> 2.5"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value))
+    if not match:
+        return None
+    raw = re.sub(r"[ \u00a0\u202f]", "", match.group()).replace(",", ".")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    number = parse_number(value)
+    return int(round(number)) if number is not None else None
+
+
+def _parse_clock_mhz(value: Any) -> Optional[int]:
+    clock = _CLOCK.search(value) if isinstance(value, str) else None
+    number = parse_number(clock.group(1) if clock else value)
+    if number is None:
+        return None
+    # '3.6 GHz' or a bare 3.6 is GHz, '2535 MHz' is already MHz
+    if "ghz" in str(value).lower() or number < 100:
+        number *= 1000
+    return int(round(number))
+
+
+def _parse_capacity_gb(value: Any) -> Optional[int]:
+    kit = _KIT.search(value) if isinstance(value, str) else None
+    number = int(kit.group(1)) * parse_number(kit.group(2)) if kit else parse_number(value)
+    if number is None:
+        return None
+    if "tb" in str(value).lower():
+        number *= 1000
+    return int(round(number))
+
+
+def _parse_socket(value: Any) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    return value.strip().upper().replace(" ", "")
+
+
+def _parse_sockets(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        value = re.split(r"[,/;]", value)
+    if not isinstance(value, (list, tuple)):
+        return None
+    sockets = [_parse_socket(v) for v in value]
+    return [s for s in sockets if s] or None
+
+
+def _parse_ram_type(value: Any) -> Optional[str]:
+    match = re.search(r"DDR\d", str(value), re.IGNORECASE)
+    return match.group().upper() if match else None
+
+
+def _parse_pcie_gen(value: Any) -> Optional[int]:
+    match = re.search(r"(?:gen\s*|pcie\s*)(\d)", str(value), re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def _parse_form_factor(value: Any) -> Optional[str]:
+    # 'E-ATX / ATX / mATX / Mini-ITX' -> the largest listed format
+    text = str(value).lower().replace(" ", "")
+    found = []
+    for part in re.split(r"[/,]", text):
+        for form_factor in FORM_FACTORS:
+            if part == form_factor.lower() or part == form_factor.lower().replace("-", ""):
+                found.append(form_factor)
+    if not found:
+        return None
+    return min(found, key=FORM_FACTORS.index)
+
+
+PARSERS: Dict[str, Callable[[Any], Any]] = {
+    "socket": _parse_socket,
+    "supported_sockets": _parse_sockets,
+    "ram_type": _parse_ram_type,
+    "form_factor": _parse_form_factor,
+    "base_clock_mhz": _parse_clock_mhz,
+    "boost_clock_mhz": _parse_clock_mhz,
+    "max_ram_speed_mhz": _parse_clock_mhz,
+    "speed_mhz": _parse_clock_mhz,
+    "capacity_gb": _parse_capacity_gb,
+    "pcie_gen": _parse_pcie_gen,
+}
+
+
+def extract_attributes(
+    product_type: ProductType,
+    specifications: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Parse free-form specifications into typed attributes (missing ones omitted)"""
+    specifications = specifications or {}
+    attributes: Dict[str, Any] = {}
+
+    for attribute, keys in SPEC_KEYS.get(product_type, {}).items():
+        for key in keys:
+            if specifications.get(key) in (None, ""):
+                continue
+            value = PARSERS.get(attribute, _parse_int)(specifications[key])
+            if value is not None:
+                attributes[attribute] = value
+                break
+
+    return attributes
+
+
+async def sync_product_attributes(db: AsyncSession, product: Product) -> ProductAttributes:
+    """
+    Re-derive the typed attributes of a product.
+    Call in the same transaction as the write; the product must already be
+    flushed so its id is set.
+    """
+    attributes = await db.get(ProductAttributes, product.id)
+    if attributes is None:
+        attributes = ProductAttributes(product_id=product.id)
+        db.add(attributes)
+
+    values = extract_attributes(product.type, product.specifications)
+    for field in ATTRIBUTE_FIELDS:
+        setattr(attributes, field, values.get(field))
+
+    return attributes
+
+
+async def delete_product_attributes(db: AsyncSession, product_id: UUID) -> None:
+    """Delete the typed attributes of a product (before deleting the product)"""
+    await db.execute(delete(ProductAttributes).where(ProductAttributes.product_id == product_id))
+
+
+async def ensure_product_attributes(db: AsyncSession) -> None:
+    """Backfill attributes for products written without them (e.g. by seed scripts)"""
+    result = await db.execute(
+        select(Product)
+        .outerjoin(ProductAttributes, ProductAttributes.product_id == Product.id)
+        .where(ProductAttributes.product_id.is_(None))
+    )
+    for product in result.scalars().all():
+        await sync_product_attributes(db, product)
+
+    await db.commit()
@@ -0,0 +1,162 @@
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.models.preset import PresetSegment
+from app.models.product import ProductType
+from app.services.alternatives import BLOCKING_RULES, AlternativesIndex, TypeArrays, get_alternatives_index
+from app.services.build_generator import BUILD_SLOTS
+from app.services.catalog import CatalogSnapshot
+from app.services.rules import POWER_RULE
+from app.services.scoring import segment_weights
+
+
+class Swap(NamedTuple):
+    slot: ProductType
+    from_id: Optional[UUID]
+    to_id: UUID
+
+
+class Upgrade(NamedTuple):
+    swaps: List[Swap]
+    cost: float  # price of the new parts
+    gain: float  # change of the build score under the segment weights
+
+    @property
+    def gain_per_pln(self) -> float:
+        return self.gain / self.cost if self.cost > 0 else 0.0
+
+
+def _related(slot: ProductType) -> Set[ProductType]:
+    """Slots whose part can make a part of `slot` incompatible"""
+    related = {rule.right_slot for rule in BLOCKING_RULES if rule.left_slot == slot}
+    related |= {rule.left_slot for rule in BLOCKING_RULES if rule.right_slot == slot}
+    power_slots = {POWER_RULE.supply_slot, *POWER_RULE.draw_slots}
+    if slot in power_slots:
+        related |= power_slots - {slot}
+    return related
+
+
+class UpgradePlanner:
+    """
+    Upgrade options for one build: every swap of a scored part, every
+    swap of two scored parts, and swaps of a scored part that also need a
+    new part it depends on (e.g. a CPU on another socket and a motherboard).
+    Candidates of a slot are screened as arrays; a loop only runs over the
+    first part of two-part swaps.
+    """
+
+    def __init__(
+        self,
+        index: AlternativesIndex,
+        selected: Dict[ProductType, UUID],
+        segment: Optional[PresetSegment],
+        budget: float,
+    ):
+        self.index = index
+        self.selected = selected
+        self.budget = budget
+        weights = segment_weights(segment)
+        self.scored = [slot for slot in BUILD_SLOTS if weights.get(slot)]
+        self.gains: Dict[ProductType, np.ndarray] = {}
+        for slot in BUILD_SLOTS:
+            arrays = self.index.types[slot]
+            score = np.nan_to_num(arrays.score)
+            current = self._row(slot)
+            base = score[current] if current is not None else 0.0
+            self.gains[slot] = weights.get(slot, 0) * (score - base)
+
+    def _row(self, slot: ProductType) -> Optional[int]:
+        product_id = self.selected.get(slot)
+        return self.index.types[slot].rows.get(product_id) if product_id is not None else None
+
+    def _buyable(self, slot: ProductType, build: Dict[ProductType, UUID], budget: float) -> np.ndarray:
+        """In-stock parts of `slot` within budget that fit the rest of `build`"""
+        arrays = self.index.types[slot]
+        rest = {s: product_id for s, product_id in build.items() if s != slot}
+        mask = arrays.in_stock & (arrays.price <= budget) & self.index.compatible_mask(slot, rest)
+        current = self._row(slot)
+        if current is not None:
+            mask[current] = False
+        return mask
+
+    def _swap(self, slot: ProductType, arrays: TypeArrays, row: int) -> Swap:
+        return Swap(slot, self.selected.get(slot), arrays.ids[row])
+
+    def singles(self, limit: int) -> List[Upgrade]:
+        upgrades = []
+        for slot in self.scored:
+            arrays = self.index.types[slot]
+            gain = self.gains[slot]
+            mask = self._buyable(slot, self.selected, self.budget) & (gain > 0)
+            rows = np.flatnonzero(mask)
+            ratio = gain[rows] / np.maximum(arrays.price[rows], 1)
+            for row in rows[np.argsort(-ratio)[:limit]]:
+                upgrades.append(Upgrade([self._swap(slot, arrays, row)], float(arrays.price[row]), float(gain[row])))
+        return upgrades
+
+    def pairs(self, limit: int) -> List[Upgrade]:
+        upgrades = []
+        for position, first in enumerate(self.scored):
+            first_arrays = self.index.types[first]
+            first_gain = self.gains[first]
+            fits_now = self._buyable(first, self.selected, self.budget)
+
+            for second in BUILD_SLOTS:
+                if second == first or second in self.scored[:position + 1]:
+                    continue
+                enabler = second not in self.scored
+                if enabler and (second not in self.selected or second not in _related(first)):
+                    continue
+
+                second_arrays = self.index.types[second]
+                second_gain = self.gains[second]
+                rest = {s: product_id for s, product_id in self.selected.items() if s != second}
+                mask = self._buyable(first, rest, self.budget) & (first_gain > 0)
+                if enabler:
+                    # Only parts the current `second` part rules out
+                    mask &= ~fits_now
+
+                best: List[Tuple[float, Upgrade]] = []
+                for row in np.flatnonzero(mask):
+                    price = first_arrays.price[row]
+                    build = {**rest, first: first_arrays.ids[row]}
+                    candidates = self._buyable(second, build, self.budget - price)
+                    if not enabler:
+                        candidates &= second_gain > 0
+                    if not candidates.any():
+                        continue
+                    ratio = np.where(
+                        candidates,
+                        (first_gain[row] + second_gain) / np.maximum(price + second_arrays.price, 1),
+                        -np.inf,
+                    )
+                    other = int(np.argmax(ratio))
+                    best.append((float(ratio[other]), Upgrade(
+                        [self._swap(first, first_arrays, row), self._swap(second, second_arrays, other)],
+                        float(price + second_arrays.price[other]),
+                        float(first_gain[row] + second_gain[other]),
+                    )))
+                best.sort(key=lambda item: -item[0])
+                upgrades.extend(upgrade for _, upgrade in best[:limit])
+        return upgrades
+
+
+def plan_upgrades(
+    snapshot: CatalogSnapshot,
+    selected: Dict[ProductType, UUID],
+    segment: Optional[PresetSegment],
+    budget: float,
+    limit: int = 10,
+) -> Tuple[List[Upgrade], float]:
+    """
+    Upgrade options within budget (the price of the new parts), best build
+    score gain per PLN first. Returns the options and the duration in ms.
+    """
+    started = time.perf_counter()
+    planner = UpgradePlanner(get_alternatives_index(snapshot), selected, segment, budget)
+    upgrades = planner.singles(limit) + planner.pairs(limit)
+    upgrades.sort(key=lambda upgrade: (-upgrade.gain_per_pln, upgrade.cost))
+    return upgrades[:limit], round((time.perf_counter() - started) * 1000, 3)
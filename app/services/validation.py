@@ -1,10 +1,112 @@
-from typing import Dict, List
+import base64
+import hashlib
+import hmac
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.models.product import Product, ProductType
+from app.core.config import settings
+from app.models.product import ProductType
+from app.schemas.product import PsuCandidate
 from app.schemas.validation import ValidationResponse, ValidationIssue
+from app.services.catalog import CatalogSnapshot, get_catalog
+from app.services.compatibility import get_compatibility_matrix
+from app.services.psu import EMBEDDED_CANDIDATES, get_psu_index
+from app.services.rules import rule_engine
+
+SLOTS = {product_type.value for product_type in ProductType}
+
+
+class ValidationCache:
+    """
+    Bounded LRU of validation results keyed by the canonical component map.
+    Entries are tagged with their product ids; when the catalog snapshot
+    changes, only entries using a changed product are dropped.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, Tuple[ValidationResponse, Set[UUID]]]" = OrderedDict()
+        self.tags: Dict[UUID, Set[str]] = {}
+        self.catalog_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(components: Dict[str, str]) -> Tuple[str, Set[UUID]]:
+        """Hash of the sorted, normalized component map and the product ids in it"""
+        normalized = {slot: str(UUID(pid)) for slot, pid in components.items() if pid}
+        digest = hashlib.sha1(json.dumps(sorted(normalized.items())).encode("utf-8")).hexdigest()
+        return digest, {UUID(pid) for pid in normalized.values()}
+
+    def sync(self, catalog: CatalogSnapshot) -> None:
+        """Drop entries that used products changed since the cached catalog version"""
+        if self.catalog_version == catalog.version:
+            return
+        if self.catalog_version is not None and self.catalog_version == catalog.previous_version:
+            self.invalidate(catalog.changed_ids)
+        else:
+            self.invalidations += len(self.entries)
+            self.clear()
+        self.catalog_version = catalog.version
+
+    def get(self, key: str) -> Optional[ValidationResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, response: ValidationResponse, product_ids: Set[UUID]) -> None:
+        self._discard(key)
+        self.entries[key] = (response, product_ids)
+        for product_id in product_ids:
+            self.tags.setdefault(product_id, set()).add(key)
+        if len(self.entries) > self.max_size:
+            self._discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def invalidate(self, product_ids: Set[UUID]) -> None:
+        for product_id in product_ids:
+            for key in list(self.tags.get(product_id, ())):
+                self._discard(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.tags.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for product_id in entry[1]:
+            keys = self.tags.get(product_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[product_id]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+validation_cache = ValidationCache(settings.validation_cache_size)
 
 
 async def validate_configuration(
@@ -13,192 +115,258 @@ async def validate_configuration(
 ) -> ValidationResponse:
     """
     Validate PC configuration compatibility.
-    Checks: socket, RAM type/speed, PSU wattage, form factors.
+    Runs the rules of app.services.rules (socket, RAM type/speed, clearance,
+    PSU wattage); pair rules are answered from the compatibility matrix.
     """
-    issues: List[ValidationIssue] = []
-    total_power = 0.0
-    recommended_psu = 0.0
+    catalog = await get_catalog(db)
+    return validate_components(catalog, components)
+
+
+async def validate_configuration_state(
+    components: Dict[str, str],
+    db: AsyncSession,
+) -> ValidationResponse:
+    """Validate a configuration and attach a state token for delta validation"""
+    catalog = await get_catalog(db)
+    return with_state(catalog, components, validate_components(catalog, components))
+
+
+async def validate_delta(
+    state: str,
+    slot: str,
+    product_id: Optional[str],
+    db: AsyncSession,
+) -> ValidationResponse:
+    """
+    Revalidate after a single slot change.
+    Only the rules reading the changed slot are run; the other results are
+    carried over from the state token. A token issued for an older catalog
+    version falls back to a full validation. Raises ValueError for an
+    invalid token, slot or product id.
+    """
+    version, components, previous = decode_state(state)
+    if slot not in SLOTS:
+        raise ValueError(slot)
+    
+    had_components = bool(components)
+    if product_id:
+        components[slot] = str(UUID(product_id))
+    else:
+        components.pop(slot, None)
     
-    # Fetch all component products
-    product_ids = [UUID(pid) for pid in components.values() if pid]
+    catalog = await get_catalog(db)
+    response = revalidate(catalog, components, ProductType(slot), previous if had_components else None, version)
+    return with_state(catalog, components, response)
+
+
+async def validate_configurations(
+    configurations: List[Dict[str, str]],
+    db: AsyncSession,
+) -> Tuple[List[ValidationResponse], int]:
+    """
+    Validate many configurations against one catalog snapshot. A malformed
+    product id fails only its own configuration. Also returns the number
+    of distinct catalog products the configurations use.
+    """
+    catalog = await get_catalog(db)
+    results = []
+    found: Set[UUID] = set()
+    for components in configurations:
+        try:
+            _, product_ids = validation_cache.key(components)
+        except ValueError:
+            results.append(invalid_ids_response(components))
+            continue
+        results.append(validate_components(catalog, components))
+        found.update(product_id for product_id in product_ids if catalog.get(product_id) is not None)
+    return results, len(found)
+
+
+def select_components(catalog: CatalogSnapshot, components: Dict[str, str]) -> Dict[ProductType, UUID]:
+    # Slots of unknown products or outside the PC component types have no rules to run
+    selected = {}
+    for slot, product_id in components.items():
+        if not product_id or slot not in SLOTS:
+            continue
+        product = catalog.get(UUID(product_id))
+        if product is not None:
+            selected[ProductType(slot)] = product.id
+    return selected
+
+
+def validate_components(catalog: CatalogSnapshot, components: Dict[str, str]) -> ValidationResponse:
+    """Validate a component map against a catalog snapshot, through the validation cache"""
+    # Fails on malformed ids even in slots that have no rules
+    key, product_ids = validation_cache.key(components)
     if not product_ids:
-        return ValidationResponse(
-            is_valid=False,
-            issues=[ValidationIssue(
-                component_type="general",
-                issue_type="missing_components",
-                severity="error",
-                message="No components provided",
-            )],
-        )
+        return no_components_response()
     
-    result = await db.execute(select(Product).where(Product.id.in_(product_ids)))
-    products = {str(p.id): p for p in result.scalars().all()}
+    validation_cache.sync(catalog)
+    response = validation_cache.get(key)
+    if response is not None:
+        return response.model_copy(update={"cached": True})
     
-    # Get component mappings
-    cpu_id = components.get("cpu")
-    motherboard_id = components.get("motherboard")
-    gpu_id = components.get("gpu")
-    ram_id = components.get("ram")
-    psu_id = components.get("psu")
-    case_id = components.get("case")
-    cooler_id = components.get("cooler")
+    response = run_validation(catalog, components)
+    validation_cache.put(key, response, product_ids)
+    return response
+
+
+def run_validation(catalog: CatalogSnapshot, components: Dict[str, str]) -> ValidationResponse:
+    """Run the compatibility rules for a component map"""
+    selected = select_components(catalog, components)
+    matrix = get_compatibility_matrix(catalog)
     
-    # 1. CPU-Motherboard socket compatibility
-    if cpu_id and motherboard_id:
-        cpu = products.get(cpu_id)
-        mb = products.get(motherboard_id)
-        
-        if cpu and mb:
-            cpu_socket = cpu.specifications.get("socket")
-            mb_socket = mb.specifications.get("socket")
-            
-            if cpu_socket and mb_socket and cpu_socket != mb_socket:
-                issues.append(ValidationIssue(
-                    component_type="cpu",
-                    issue_type="socket_mismatch",
-                    severity="error",
-                    message=f"CPU socket ({cpu_socket}) does not match motherboard socket ({mb_socket})",
-                    details={"cpu_socket": cpu_socket, "mb_socket": mb_socket},
-                ))
-            
-            # Check CPU power consumption
-            cpu_tdp = cpu.specifications.get("tdp", 0)
-            if isinstance(cpu_tdp, (int, float)):
-                total_power += float(cpu_tdp)
+    issues, total_power, recommended_psu, trace = rule_engine.run(
+        {slot: catalog.attributes_of(product_id) for slot, product_id in selected.items()},
+        lookup=lambda rule: matrix.compatible(rule, selected[rule.left_slot], selected[rule.right_slot]),
+    )
     
-    # 2. RAM compatibility
-    if ram_id and motherboard_id:
-        ram = products.get(ram_id)
-        mb = products.get(motherboard_id)
-        
-        if ram and mb:
-            ram_type = ram.specifications.get("type")  # DDR4, DDR5
-            mb_ram_type = mb.specifications.get("ram_type")
-            
-            if ram_type and mb_ram_type and ram_type != mb_ram_type:
-                issues.append(ValidationIssue(
-                    component_type="ram",
-                    issue_type="ram_type_mismatch",
-                    severity="error",
-                    message=f"RAM type ({ram_type}) does not match motherboard RAM type ({mb_ram_type})",
-                    details={"ram_type": ram_type, "mb_ram_type": mb_ram_type},
-                ))
-            
-            # Check RAM speed compatibility
-            ram_speed = ram.specifications.get("speed")
-            mb_max_speed = mb.specifications.get("ram_max_speed")
-            if ram_speed and mb_max_speed:
-                try:
-                    if int(ram_speed) > int(mb_max_speed):
-                        issues.append(ValidationIssue(
-                            component_type="ram",
-                            issue_type="ram_speed_warning",
-                            severity="warning",
-                            message=f"RAM speed ({ram_speed} MHz) exceeds motherboard max ({mb_max_speed} MHz)",
-                        ))
-                except (ValueError, TypeError):
-                    pass
+    return ValidationResponse(
+        is_valid=all(issue.severity != "error" for issue in issues),
+        issues=issues,
+        total_power_consumption=total_power if total_power > 0 else None,
+        recommended_psu_wattage=recommended_psu if recommended_psu > 0 else None,
+        rules=trace,
+    )
+
+
+def revalidate(
+    catalog: CatalogSnapshot,
+    components: Dict[str, str],
+    slot: ProductType,
+    previous: Optional[ValidationResponse],
+    previous_version: Optional[int],
+) -> ValidationResponse:
+    """
+    Validate a component map after a change to `slot`, through the cache.
+    The previous results are reused when they were computed on the current
+    catalog version; otherwise all rules run.
+    """
+    key, product_ids = validation_cache.key(components)
+    if not product_ids:
+        return no_components_response()
     
-    # 3. GPU power consumption and form factor
-    if gpu_id:
-        gpu = products.get(gpu_id)
-        if gpu:
-            gpu_power = gpu.specifications.get("power_consumption", 0)
-            if isinstance(gpu_power, (int, float)):
-                total_power += float(gpu_power)
-            
-            # Check GPU dimensions vs case
-            if case_id:
-                case = products.get(case_id)
-                if case:
-                    gpu_length = gpu.specifications.get("length")
-                    case_max_gpu = case.specifications.get("max_gpu_length")
-                    
-                    if gpu_length and case_max_gpu:
-                        try:
-                            if float(gpu_length) > float(case_max_gpu):
-                                issues.append(ValidationIssue(
-                                    component_type="gpu",
-                                    issue_type="form_factor",
-                                    severity="error",
-                                    message=f"GPU length ({gpu_length} mm) exceeds case max ({case_max_gpu} mm)",
-                                ))
-                        except (ValueError, TypeError):
-                            pass
+    validation_cache.sync(catalog)
+    response = validation_cache.get(key)
+    if response is not None:
+        return response.model_copy(update={"cached": True})
     
-    # 4. PSU wattage check
-    if psu_id:
-        psu = products.get(psu_id)
-        if psu:
-            psu_wattage = psu.specifications.get("wattage", 0)
-            try:
-                psu_wattage = float(psu_wattage)
-                recommended_psu = total_power * 1.2  # 20% headroom
-                
-                if psu_wattage < total_power:
-                    issues.append(ValidationIssue(
-                        component_type="psu",
-                        issue_type="insufficient_power",
-                        severity="error",
-                        message=f"PSU wattage ({psu_wattage}W) is insufficient. Required: ~{total_power:.0f}W",
-                        details={"psu_wattage": psu_wattage, "required": total_power},
-                    ))
-                elif psu_wattage < recommended_psu:
-                    issues.append(ValidationIssue(
-                        component_type="psu",
-                        issue_type="low_power_margin",
-                        severity="warning",
-                        message=f"PSU wattage ({psu_wattage}W) is close to recommended ({recommended_psu:.0f}W)",
-                    ))
-            except (ValueError, TypeError):
-                pass
+    if previous is not None and previous_version == catalog.version:
+        response = rerun_slot(catalog, components, slot, previous)
+    else:
+        response = run_validation(catalog, components)
+    validation_cache.put(key, response, product_ids)
+    return response
+
+
+def rerun_slot(
+    catalog: CatalogSnapshot,
+    components: Dict[str, str],
+    slot: ProductType,
+    previous: ValidationResponse,
+) -> ValidationResponse:
+    """Re-run the rules reading `slot` and merge them with the previous results"""
+    selected = select_components(catalog, components)
+    matrix = get_compatibility_matrix(catalog)
     
-    # 5. Cooler compatibility
-    if cooler_id and cpu_id:
-        cooler = products.get(cooler_id)
-        cpu = products.get(cpu_id)
-        
-        if cooler and cpu:
-            cooler_sockets = cooler.specifications.get("socket", [])
-            cpu_socket = cpu.specifications.get("socket")
-            
-            if cpu_socket and cooler_sockets:
-                if isinstance(cooler_sockets, str):
-                    cooler_sockets = [cooler_sockets]
-                if cpu_socket not in cooler_sockets:
-                    issues.append(ValidationIssue(
-                        component_type="cooler",
-                        issue_type="socket_mismatch",
-                        severity="error",
-                        message=f"Cooler does not support CPU socket ({cpu_socket})",
-                    ))
-            
-            # Check cooler height vs case
-            if case_id:
-                case = products.get(case_id)
-                if case:
-                    cooler_height = cooler.specifications.get("height")
-                    case_max_cooler = case.specifications.get("max_cooler_height")
-                    
-                    if cooler_height and case_max_cooler:
-                        try:
-                            if float(cooler_height) > float(case_max_cooler):
-                                issues.append(ValidationIssue(
-                                    component_type="cooler",
-                                    issue_type="form_factor",
-                                    severity="error",
-                                    message=f"Cooler height ({cooler_height} mm) exceeds case max ({case_max_cooler} mm)",
-                                ))
-                        except (ValueError, TypeError):
-                            pass
+    issues, total_power, recommended_psu, trace = rule_engine.run(
+        {s: catalog.attributes_of(product_id) for s, product_id in selected.items()},
+        lookup=lambda rule: matrix.compatible(rule, selected[rule.left_slot], selected[rule.right_slot]),
+        slot=slot,
+    )
     
-    is_valid = all(issue.severity != "error" for issue in issues)
+    rerun = set(rule_engine.rules_for(slot))
+    issues = [issue for issue in previous.issues if issue.rule not in rerun] + issues
+    if total_power is None:
+        total_power = previous.total_power_consumption or 0
+        recommended_psu = previous.recommended_psu_wattage or 0
     
     return ValidationResponse(
-        is_valid=is_valid,
+        is_valid=all(issue.severity != "error" for issue in issues),
         issues=issues,
         total_power_consumption=total_power if total_power > 0 else None,
         recommended_psu_wattage=recommended_psu if recommended_psu > 0 else None,
+        rules=trace,
     )
 
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(settings.jwt_secret.encode("utf-8"), payload, hashlib.sha256).hexdigest()[:32]
+
+
+def encode_state(version: int, components: Dict[str, str], response: ValidationResponse) -> str:
+    """Signed, self-contained validation state, so any worker can continue from it"""
+    payload = json.dumps({
+        "v": version,
+        "c": {slot: str(UUID(pid)) for slot, pid in components.items() if pid},
+        "r": response.model_dump(mode="json", include={"issues", "total_power_consumption", "recommended_psu_wattage"}),
+    }, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=") + "." + _sign(payload)
+
+
+def decode_state(state: str) -> Tuple[int, Dict[str, str], ValidationResponse]:
+    try:
+        encoded, signature = state.rsplit(".", 1)
+        payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid validation state")
+    # Compare bytes: str comparison raises TypeError on non-ASCII signatures
+    if not hmac.compare_digest(signature.encode("utf-8"), _sign(payload).encode("ascii")):
+        raise ValueError("Invalid validation state")
+    
+    try:
+        data = json.loads(payload)
+        version, components = data["v"], data["c"]
+        if not isinstance(version, int) or not isinstance(components, dict):
+            raise ValueError(state)
+        previous = ValidationResponse(is_valid=True, **data["r"])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid validation state")
+    return version, components, previous
+
+
+def with_state(catalog: CatalogSnapshot, components: Dict[str, str], response: ValidationResponse) -> ValidationResponse:
+    """
+    Add the delta-validation token and PSU candidates.
+    Neither is cached: cached responses are shared, and candidates depend on
+    PSU prices and stock rather than on the build's own products.
+    """
+    return response.model_copy(update={
+        "state": encode_state(catalog.version, components, response),
+        "psu_candidates": psu_candidates_for(catalog, response),
+    })
+
+
+def psu_candidates_for(catalog: CatalogSnapshot, response: ValidationResponse) -> List[PsuCandidate]:
+    required = response.recommended_psu_wattage or response.total_power_consumption
+    if not required:
+        return []
+    return get_psu_index(catalog).candidates(required, EMBEDDED_CANDIDATES)
+
+
+def invalid_ids_response(components: Dict[str, str]) -> ValidationResponse:
+    issues = []
+    for slot, product_id in components.items():
+        try:
+            if product_id:
+                UUID(product_id)
+        except ValueError:
+            issues.append(ValidationIssue(
+                component_type=slot,
+                issue_type="invalid_id",
+                severity="error",
+                message=f"Invalid product id: {product_id}",
+            ))
+    return ValidationResponse(is_valid=False, issues=issues)
+
+
+def no_components_response() -> ValidationResponse:
+    return ValidationResponse(
+        is_valid=False,
+        issues=[ValidationIssue(
+            component_type="general",
+            issue_type="missing_components",
+            severity="error",
+            message="No components provided",
+        )],
+    )
@@ -1,12 +1,14 @@
 import asyncio
 from app.core.database import AsyncSessionLocal
 from app.models.preset import Preset
+from app.services.catalog import bump_catalog_version, PRESETS_CATALOG
 from sqlalchemy import delete
 
 async def delete_presets():
     async with AsyncSessionLocal() as db:
         print("Deleting all presets...")
         await db.execute(delete(Preset))
+        await bump_catalog_version(db, PRESETS_CATALOG)
         await db.commit()
         print("All presets deleted.")
 